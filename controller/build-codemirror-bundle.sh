@@ -0,0 +1,47 @@
+#!/usr/bin/env bash
+#
+# Build the CodeMirror bundle served from /controller/static
+#
+# Downloads the CodeMirror files pinned in codemirror-assets.txt once and
+# concatenates them (in load order) into static/codemirror-bundle.min.{js,css}.
+# The dashboard falls back to the CDN tags when the bundle is missing.
+#
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+STATIC_DIR="${SCRIPT_DIR}/static"
+ASSETS_FILE="${SCRIPT_DIR}/codemirror-assets.txt"
+
+# Version and file lists are shared with main.py's CDN fallback
+CM_VERSION=""
+CSS_FILES=()
+JS_FILES=()
+while read -r kind value _; do
+    case "$kind" in
+        version) CM_VERSION="$value" ;;
+        css) CSS_FILES+=("$value") ;;
+        js) JS_FILES+=("$value") ;;
+    esac
+done < "$ASSETS_FILE"
+[[ -n "$CM_VERSION" ]] || { echo "[codemirror] No version in ${ASSETS_FILE}" >&2; exit 1; }
+CM_BASE="https://cdnjs.cloudflare.com/ajax/libs/codemirror/${CM_VERSION}"
+
+log() { echo "[codemirror] $1"; }
+
+# bundle <output> <separator> <files...>: fetch each file and join them into output
+bundle() {
+    local out="$1" sep="$2"; shift 2
+    local tmp
+    tmp="$(mktemp "${out}.XXXXXX")"
+    for f in "$@"; do
+        curl -fsSL "${CM_BASE}/${f}" >> "$tmp" || { rm -f "$tmp"; return 1; }
+        printf '%b' "$sep" >> "$tmp"
+    done
+    mv "$tmp" "$out"
+    log "Wrote ${out} ($(wc -c < "$out") bytes)"
+}
+
+mkdir -p "$STATIC_DIR"
+# Minified scripts may end without a newline or semicolon
+bundle "${STATIC_DIR}/codemirror-bundle.min.js" '\n;\n' "${JS_FILES[@]}"
+bundle "${STATIC_DIR}/codemirror-bundle.min.css" '\n' "${CSS_FILES[@]}"
@@ -5,18 +5,22 @@ Intercepts outbound LLM API calls, logs request/response to JSONL,
 extracts token usage, and applies scrub rules before writing to disk.
 
 Usage:
-    python3 -m uvicorn llm_proxy:create_app --factory --host 0.0.0.0 --port 9090
+    python3 -m uvicorn llm_proxy:create_app --factory --host 0.0.0.0 --port 9090 \
+        --loop uvloop --http httptools --no-access-log
 """
 
+import asyncio
+import collections
+import itertools
 import json
 import os
 import time
-import uuid
 from pathlib import Path
 
 import httpx
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from scrub import scrub, scrub_dict
 
@@ -30,29 +34,139 @@ PROVIDERS = {
 }
 
 
+def _make_url_builder(base_url: str):
+    """Return a closure that builds the upstream URL for one provider."""
+    def build(path: str, query: str) -> str:
+        return f"{base_url}/{path}?{query}" if query else f"{base_url}/{path}"
+    return build
+
+
+# Connection warm-up at startup: an authenticated model listing per provider
+# whose API key is in the proxy's environment (keys normally arrive with each
+# request, so providers without one are skipped). LLM_PROXY_WARM=0 turns it
+# off entirely, e.g. for offline VMs and tests.
+WARM_CONNECTIONS = os.environ.get("LLM_PROXY_WARM", "1").lower() not in ("0", "false", "no", "off")
+WARM_REQUESTS = {
+    "anthropic": ("ANTHROPIC_API_KEY", "/v1/models", lambda key: {"x-api-key": key, "anthropic-version": "2023-06-01"}),
+    "openai": ("OPENAI_API_KEY", "/v1/models", lambda key: {"authorization": f"Bearer {key}"}),
+    "gemini": ("GEMINI_API_KEY", "/v1beta/models", lambda key: {"x-goog-api-key": key}),
+}
+
+
+# Provider name -> upstream URL builder, resolved with a single lookup per request
+PROVIDER_DISPATCH = {name: _make_url_builder(base) for name, base in PROVIDERS.items()}
+
+# Hop-by-hop headers dropped when forwarding. Response bodies are re-framed
+# (and already decoded by httpx), so their encoding/length headers go too.
+SKIP_REQUEST_HEADERS = frozenset({"host", "transfer-encoding", "connection", "keep-alive"})
+SKIP_RESPONSE_HEADERS = frozenset({
+    "transfer-encoding", "connection", "keep-alive", "content-encoding", "content-length",
+})
+
+# Request IDs: random per-process prefix + counter (unique within the log,
+# no urandom call per request)
+_REQUEST_ID_PREFIX = os.urandom(4).hex()
+_request_counter = itertools.count(int.from_bytes(os.urandom(4), "big"))
+
+
+def _next_request_id() -> str:
+    return f"{_REQUEST_ID_PREFIX}{next(_request_counter):016x}"
+
+
+# Request bodies larger than this are streamed upstream rather than buffered
+STREAM_UPLOAD_MIN = 64 * 1024
+
+# Log entries are queued by the request path and written in batches by
+# _log_writer() so disk I/O never blocks a proxied call.
+LOG_QUEUE_MAX = 10000
+LOG_BATCH_MAX = 256
+_log_queue: asyncio.Queue | None = None  # Created on startup, bound to the serving loop
+
+
+# Capture state is cached and only re-read when the state file's mtime changes
+# (the controller toggles it from another process).
+_capture_state: bool = True
+_capture_mtime: float | None = None
+
+
 def _is_capture_enabled() -> bool:
     """Check if traffic capture is enabled (default: True)."""
-    if not CAPTURE_STATE_FILE.exists():
-        return True
+    global _capture_state, _capture_mtime
     try:
-        return CAPTURE_STATE_FILE.read_text().strip() == "1"
-    except Exception:
+        mtime = os.stat(CAPTURE_STATE_FILE).st_mtime
+    except OSError:
+        _capture_state, _capture_mtime = True, None
         return True
+    if mtime != _capture_mtime:
+        try:
+            _capture_state = CAPTURE_STATE_FILE.read_text().strip() == "1"
+        except Exception:
+            _capture_state = True
+        _capture_mtime = mtime
+    return _capture_state
 
 
 def _set_capture_enabled(enabled: bool):
     """Set capture enabled state."""
+    global _capture_state, _capture_mtime
     CAPTURE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
     CAPTURE_STATE_FILE.write_text("1" if enabled else "0")
+    _capture_state = enabled
+    _capture_mtime = os.stat(CAPTURE_STATE_FILE).st_mtime
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (bytes out, no separate encode step)."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="ClawFactory LLM Proxy", version="1.0.0")
-    client = httpx.AsyncClient(timeout=httpx.Timeout(300.0, connect=30.0))
+    app = FastAPI(title="ClawFactory LLM Proxy", version="1.0.0", default_response_class=ORJSONResponse)
+    # HTTP/2 multiplexes concurrent calls to a provider over a few connections;
+    # the pool is sized so bursts don't fall back to fresh TLS handshakes.
+    limits = httpx.Limits(max_connections=512, max_keepalive_connections=256, keepalive_expiry=120)
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(300.0, connect=30.0),
+        transport=httpx.AsyncHTTPTransport(http2=True, limits=limits, retries=0),
+    )
+    log_writer_task = None
+    warm_task = None
+
+    async def _warm_provider(provider: str, key_env: str, path: str, auth_headers) -> None:
+        try:
+            resp = await client.get(PROVIDERS[provider] + path, headers=auth_headers(os.environ[key_env]))
+        except httpx.HTTPError as e:
+            print(f"[llm-proxy] warm-up {provider}: {type(e).__name__}: {e}")
+            return
+        if resp.is_error:
+            print(f"[llm-proxy] warm-up {provider}: HTTP {resp.status_code}")
+
+    async def _warm_connections():
+        """Open a connection to each configured provider so the first real call skips TLS setup."""
+        await asyncio.gather(*(
+            _warm_provider(provider, key_env, path, auth_headers)
+            for provider, (key_env, path, auth_headers) in WARM_REQUESTS.items()
+            if os.environ.get(key_env)
+        ))
+
+    @app.on_event("startup")
+    async def startup():
+        nonlocal log_writer_task, warm_task
+        log_writer_task = _start_log_writer()
+        if WARM_CONNECTIONS:
+            warm_task = asyncio.create_task(_warm_connections())
 
     @app.on_event("shutdown")
     async def shutdown():
+        if warm_task:
+            warm_task.cancel()
         await client.aclose()
+        if log_writer_task:
+            await _log_queue.put(None)  # Sentinel: flush what's queued, then stop
+            await log_writer_task
 
     @app.get("/health")
     async def health():
@@ -71,81 +185,95 @@ def create_app() -> FastAPI:
 
     @app.api_route("/{provider}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
     async def proxy(provider: str, path: str, request: Request):
-        if provider not in PROVIDERS:
-            return JSONResponse(
+        build_url = PROVIDER_DISPATCH.get(provider)
+        if build_url is None:
+            return ORJSONResponse(
                 {"error": f"Unknown provider: {provider}", "available": list(PROVIDERS.keys())},
                 status_code=404,
             )
 
-        upstream = PROVIDERS[provider]
-        url = f"{upstream}/{path}"
-        if request.url.query:
-            url += f"?{request.url.query}"
-
-        # Read request body
-        request_body_bytes = await request.body()
-        request_body = None
-        if request_body_bytes:
-            try:
-                request_body = json.loads(request_body_bytes)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                request_body = request_body_bytes.decode("utf-8", errors="replace")
-
-        # Forward headers (exclude host and hop-by-hop)
-        skip_headers = {"host", "transfer-encoding", "connection", "keep-alive"}
-        headers = {k: v for k, v in request.headers.items() if k.lower() not in skip_headers}
+        url = build_url(path, request.scope["query_string"].decode("latin-1"))
+
+        # Build log and forward headers in one pass (forward excludes host and hop-by-hop)
+        log_headers = {}
+        headers = {}
+        for raw_key, raw_value in request.headers.raw:
+            key = raw_key.decode("latin-1").lower()
+            value = raw_value.decode("latin-1")
+            log_headers[key] = value
+            if key not in SKIP_REQUEST_HEADERS:
+                headers[key] = value
+
+        # Large (or chunked) uploads are piped upstream as they arrive instead
+        # of being buffered first. Whether the reply streams is then decided
+        # from the response content-type, since the body isn't parsed.
+        content_length = log_headers.get("content-length", "")
+        if content_length.isdigit():
+            stream_upload = int(content_length) > STREAM_UPLOAD_MIN
+        else:
+            stream_upload = "chunked" in log_headers.get("transfer-encoding", "")
 
-        # Detect streaming request
         is_streaming = False
-        if isinstance(request_body, dict):
-            is_streaming = request_body.get("stream", False)
-
-        request_id = str(uuid.uuid4())
+        if stream_upload:
+            capture_buf = bytearray() if _is_capture_enabled() else None
+            content = _tee_stream(request.stream(), capture_buf)
+            request_body = capture_buf
+        else:
+            # Read request body. It is only parsed here when it may carry a
+            # "stream" flag; otherwise the raw bytes go to the log writer, which
+            # decodes them off the request path (and only if capture is on).
+            content = await request.body()
+            request_body = content or None
+            if content and b'"stream"' in content:
+                request_body = _decode_body(content)
+            # Detect streaming request
+            if isinstance(request_body, dict):
+                is_streaming = request_body.get("stream", False)
+
+        request_id = _next_request_id()
         start_time = time.time()
 
         try:
-            if is_streaming:
-                return await _handle_streaming(
-                    client, request.method, url, headers, request_body_bytes,
-                    request_id, start_time, provider, path, request_body,
+            if is_streaming or stream_upload:
+                # Send with a streamed response so headers come back first
+                resp = await client.send(
+                    client.build_request(request.method, url, headers=headers, content=content),
+                    stream=True,
                 )
+                if is_streaming or resp.headers.get("content-type", "").startswith("text/event-stream"):
+                    return _stream_response(
+                        resp, request.method, request_id, start_time, provider, path,
+                        request_body, log_headers,
+                    )
+                await resp.aread()
             else:
                 resp = await client.request(
                     method=request.method,
                     url=url,
                     headers=headers,
-                    content=request_body_bytes,
-                )
-                duration_ms = (time.time() - start_time) * 1000
-                response_body = None
-                try:
-                    response_body = resp.json()
-                except Exception:
-                    response_body = resp.text
-
-                _write_log(
-                    request_id=request_id,
-                    provider=provider,
-                    method=request.method,
-                    path=path,
-                    request_headers=dict(request.headers),
-                    request_body=request_body,
-                    response_status=resp.status_code,
-                    response_body=response_body,
-                    duration_ms=duration_ms,
-                    streaming=False,
+                    content=content,
                 )
+            duration_ms = (time.time() - start_time) * 1000
+            # Logged as raw bytes; the log writer parses them off the request path
+            _write_log(
+                request_id=request_id,
+                provider=provider,
+                method=request.method,
+                path=path,
+                request_headers=log_headers,
+                request_body=request_body,
+                response_status=resp.status_code,
+                response_body=resp.content,
+                duration_ms=duration_ms,
+                streaming=False,
+            )
 
-                # Forward response
-                response_headers = {
-                    k: v for k, v in resp.headers.items()
-                    if k.lower() not in {"transfer-encoding", "content-encoding", "content-length"}
-                }
-                return JSONResponse(
-                    content=response_body if isinstance(response_body, (dict, list)) else {"raw": response_body},
-                    status_code=resp.status_code,
-                    headers=response_headers,
-                )
+            # Forward the upstream body untouched
+            return Response(
+                content=resp.content,
+                status_code=resp.status_code,
+                headers=_response_headers(resp),
+            )
 
         except httpx.ConnectError as e:
             duration_ms = (time.time() - start_time) * 1000
@@ -154,7 +282,7 @@ def create_app() -> FastAPI:
                 provider=provider,
                 method=request.method,
                 path=path,
-                request_headers=dict(request.headers),
+                request_headers=log_headers,
                 request_body=request_body,
                 response_status=502,
                 response_body=None,
@@ -162,7 +290,7 @@ def create_app() -> FastAPI:
                 streaming=False,
                 error=str(e),
             )
-            return JSONResponse({"error": f"Cannot connect to {provider}: {e}"}, status_code=502)
+            return ORJSONResponse({"error": f"Cannot connect to {provider}: {e}"}, status_code=502)
         except httpx.TimeoutException as e:
             duration_ms = (time.time() - start_time) * 1000
             _write_log(
@@ -170,7 +298,7 @@ def create_app() -> FastAPI:
                 provider=provider,
                 method=request.method,
                 path=path,
-                request_headers=dict(request.headers),
+                request_headers=log_headers,
                 request_body=request_body,
                 response_status=504,
                 response_body=None,
@@ -178,44 +306,30 @@ def create_app() -> FastAPI:
                 streaming=False,
                 error=str(e),
             )
-            return JSONResponse({"error": f"Timeout connecting to {provider}: {e}"}, status_code=504)
+            return ORJSONResponse({"error": f"Timeout connecting to {provider}: {e}"}, status_code=504)
 
-    async def _handle_streaming(
-        client, method, url, headers, body_bytes,
-        request_id, start_time, provider, path, request_body,
+    def _stream_response(
+        resp, method, request_id, start_time, provider, path, request_body, log_headers,
     ):
-        """Handle streaming (SSE) responses — accumulate chunks, log after completion."""
-        accumulated_data = []
-        response_status = None
-
-        # Make a streaming request to get headers first
-        resp = await client.send(
-            client.build_request(method, url, headers=headers, content=body_bytes),
-            stream=True,
-        )
+        """Relay a streaming (SSE) response — parse chunks as they pass, log after completion."""
+        parser = SSEParser()
         response_status = resp.status_code
 
-        response_headers = {
-            k: v for k, v in resp.headers.items()
-            if k.lower() not in {"transfer-encoding", "connection"}
-        }
-
         async def stream_body():
             try:
                 async for chunk in resp.aiter_bytes():
-                    accumulated_data.append(chunk)
+                    parser.feed(chunk)
                     yield chunk
             finally:
                 await resp.aclose()
                 duration_ms = (time.time() - start_time) * 1000
-                full_response = b"".join(accumulated_data)
-                response_body = _parse_sse_response(full_response, provider)
+                response_body = parser.result()
                 _write_log(
                     request_id=request_id,
                     provider=provider,
                     method=method,
                     path=path,
-                    request_headers=headers,
+                    request_headers=log_headers,
                     request_body=request_body,
                     response_status=response_status,
                     response_body=response_body,
@@ -226,38 +340,120 @@ def create_app() -> FastAPI:
         return StreamingResponse(
             stream_body(),
             status_code=resp.status_code,
-            headers=response_headers,
+            headers=_response_headers(resp),
             media_type=resp.headers.get("content-type", "text/event-stream"),
         )
 
     return app
 
 
-def _parse_sse_response(data: bytes, provider: str):
-    """Parse SSE stream data to extract final response content."""
-    text = data.decode("utf-8", errors="replace")
-    # Try to parse as JSON lines (some providers send JSONL)
-    events = []
-    for line in text.split("\n"):
-        line = line.strip()
-        if line.startswith("data: "):
-            payload = line[6:]
-            if payload == "[DONE]":
-                continue
-            try:
-                events.append(json.loads(payload))
-            except json.JSONDecodeError:
-                continue
+def _response_headers(resp: httpx.Response) -> dict:
+    """Upstream response headers to forward (httpx keys are already lowercase)."""
+    return {k: v for k, v in resp.headers.items() if k not in SKIP_RESPONSE_HEADERS}
+
+
+class BufferPool:
+    """Bounded pool of reusable bytearrays, shared by all streaming requests."""
+
+    def __init__(self, size: int = 64):
+        self._free = collections.deque(maxlen=size)
+
+    def get(self) -> bytearray:
+        try:
+            return self._free.pop()
+        except IndexError:
+            return bytearray()
+
+    def put(self, buf: bytearray):
+        del buf[:]
+        self._free.append(buf)
+
+
+BUF_POOL = BufferPool()
+
+
+class SSEParser:
+    """Incremental SSE parser — consumes chunks as they stream past.
+
+    Only the event count and the last event are kept, so the full response is
+    never buffered. The first SSE_RAW_KEEP bytes are retained until an event is
+    seen, for responses that turn out not to be SSE (e.g. a JSON error body).
+    Lines are parsed straight out of a pooled buffer via memoryview slices.
+    """
+
+    SSE_RAW_KEEP = 64 * 1024
+
+    def __init__(self):
+        self._buf = BUF_POOL.get()
+        self._raw = bytearray()
+        self.count = 0
+        self.last_event = None
+
+    def feed(self, chunk: bytes):
+        if not self.count and len(self._raw) < self.SSE_RAW_KEEP:
+            self._raw += chunk[:self.SSE_RAW_KEEP - len(self._raw)]
+        buf = self._buf
+        buf += chunk
+        start = 0
+        with memoryview(buf) as view:
+            while (nl := buf.find(b"\n", start)) != -1:
+                self._parse_line(view[start:nl])
+                start = nl + 1
+        if start:
+            del buf[:start]
+
+    def _parse_line(self, line: memoryview):
+        if line[:6] != b"data: ":
+            return
+        payload = line[6:]
+        if payload[-1:] == b"\r":
+            payload = payload[:-1]
+        if payload == b"[DONE]":
+            return
+        try:
+            event = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            return
+        self.count += 1
+        self.last_event = event
+        if self._raw:
+            self._raw = bytearray()
+
+    def result(self):
+        """Flush any trailing line, release the buffer and return the body to log."""
+        buf, self._buf = self._buf, bytearray()
+        if buf:
+            with memoryview(buf) as view:
+                self._parse_line(view)
+        BUF_POOL.put(buf)
+        if self.count:
+            return {"_stream_events": self.count, "_last_event": self.last_event}
+
+        # Fallback: try to parse as single JSON
+        text = self._raw.decode("utf-8", errors="replace")
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            # Return truncated raw text
+            return text[:2000] if len(text) > 2000 else text
+
 
-    if events:
-        return {"_stream_events": len(events), "_last_event": events[-1] if events else None}
+async def _tee_stream(chunks, capture: bytearray | None):
+    """Pass request body chunks through, copying them into capture for the log."""
+    async for chunk in chunks:
+        if capture is not None:
+            capture += chunk
+        yield chunk
 
-    # Fallback: try to parse as single JSON
+
+def _decode_body(raw: bytes | bytearray):
+    """Decode a logged body: parsed JSON if possible, else text (None if empty)."""
+    if not raw:
+        return None
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        # Return truncated raw text
-        return text[:2000] if len(text) > 2000 else text
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return raw.decode("utf-8", errors="replace")
 
 
 def _extract_tokens(body, provider: str) -> tuple[int, int]:
@@ -275,19 +471,51 @@ def _extract_tokens(body, provider: str) -> tuple[int, int]:
     if not usage or not isinstance(usage, dict):
         return 0, 0
 
-    if provider == "anthropic":
-        return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
-    elif provider == "openai":
-        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
-    elif provider == "gemini":
-        return usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0)
+    return _TOKEN_EXTRACTORS.get(provider, _tokens_generic)(usage)
+
+
+def _tokens_anthropic(usage: dict) -> tuple[int, int]:
+    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def _tokens_openai(usage: dict) -> tuple[int, int]:
+    return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
 
-    # Generic fallback
+
+def _tokens_gemini(usage: dict) -> tuple[int, int]:
+    return usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0)
+
+
+def _tokens_generic(usage: dict) -> tuple[int, int]:
     tokens_in = usage.get("input_tokens", usage.get("prompt_tokens", 0))
     tokens_out = usage.get("output_tokens", usage.get("completion_tokens", 0))
     return tokens_in, tokens_out
 
 
+# Provider -> usage-dict token extractor (unknown providers use the generic one)
+_TOKEN_EXTRACTORS = {
+    "anthropic": _tokens_anthropic,
+    "openai": _tokens_openai,
+    "gemini": _tokens_gemini,
+}
+
+
+# The second-resolution part of the log timestamp is formatted once per second.
+_ts_second = 0
+_ts_cached = ""
+
+
+def _timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with microseconds."""
+    global _ts_second, _ts_cached
+    now_ns = time.time_ns()
+    sec = now_ns // 1_000_000_000
+    if sec != _ts_second:
+        _ts_second = sec
+        _ts_cached = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+    return f"{_ts_cached}.{(now_ns // 1000) % 1_000_000:06d}Z"
+
+
 def _write_log(
     request_id: str,
     provider: str,
@@ -301,38 +529,127 @@ def _write_log(
     streaming: bool,
     error: str | None = None,
 ):
-    """Write a scrubbed log entry to the traffic JSONL file."""
+    """Queue a log entry for the traffic JSONL file.
+
+    Only the raw entry is built here; token extraction, scrubbing and
+    serialization happen off the event loop in _scrub_and_serialize().
+    """
     if not _is_capture_enabled():
         return
 
-    tokens_in, tokens_out = _extract_tokens(response_body, provider)
-
     entry = {
         "id": request_id,
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+        "timestamp": _timestamp(),
         "provider": provider,
         "method": method,
         "path": path,
-        "request_headers": scrub_dict(request_headers),
-        "request_body": scrub_dict(request_body),
+        "request_headers": request_headers,
+        "request_body": request_body,
         "response_status": response_status,
-        "response_body": scrub_dict(response_body),
+        "response_body": response_body,
         "duration_ms": round(duration_ms, 1),
-        "tokens_in": tokens_in,
-        "tokens_out": tokens_out,
+        "tokens_in": 0,
+        "tokens_out": 0,
         "streaming": streaming,
     }
     if error:
         entry["error"] = error
 
+    if _log_queue is None:
+        return  # Writer not started
     try:
-        TRAFFIC_LOG.parent.mkdir(parents=True, exist_ok=True)
-        with open(TRAFFIC_LOG, "a") as f:
-            f.write(json.dumps(entry, default=str) + "\n")
-    except Exception:
-        pass  # Don't let logging failures break the proxy
+        _log_queue.put_nowait(entry)
+    except asyncio.QueueFull:
+        pass  # Drop the entry rather than stall the proxy
+
+
+def _scrub_and_serialize(entries: list) -> list[bytes]:
+    """Finish a batch of raw entries (tokens + scrubbing) and serialize each to a JSONL line."""
+    out = []
+    for e in entries:
+        if isinstance(e["request_body"], (bytes, bytearray)):
+            e["request_body"] = _decode_body(e["request_body"])
+        if isinstance(e["response_body"], bytes):
+            e["response_body"] = _decode_body(e["response_body"])
+        e["tokens_in"], e["tokens_out"] = _extract_tokens(e["response_body"], e["provider"])
+        e["request_headers"] = scrub_dict(e["request_headers"])
+        e["request_body"] = scrub_dict(e["request_body"])
+        e["response_body"] = scrub_dict(e["response_body"])
+        out.append(orjson.dumps(e, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS))
+    return out
+
+
+_log_fd: int | None = None
+
+
+def _traffic_log_fd() -> int:
+    """Persistent O_APPEND fd for TRAFFIC_LOG, reopened if the file was removed or replaced."""
+    global _log_fd
+    if _log_fd is not None:
+        try:
+            if os.stat(TRAFFIC_LOG).st_ino == os.fstat(_log_fd).st_ino:
+                return _log_fd
+        except FileNotFoundError:
+            pass
+        os.close(_log_fd)
+        _log_fd = None
+    TRAFFIC_LOG.parent.mkdir(parents=True, exist_ok=True)
+    _log_fd = os.open(TRAFFIC_LOG, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    return _log_fd
+
+
+def _write_batch(entries: list):
+    """Serialize a batch and append it with one writev() call.
+
+    CPU-bound and blocking; runs in the default executor.
+    """
+    iov = _scrub_and_serialize(entries)
+    fd = _traffic_log_fd()
+    written = os.writev(fd, iov)
+    total = sum(map(len, iov))
+    if written < total:  # Short write: finish the remainder
+        rest = memoryview(b"".join(iov))[written:]
+        while rest:
+            rest = rest[os.write(fd, rest):]
+
+
+def _start_log_writer() -> asyncio.Task:
+    """Create the log queue on the running loop and start its writer task."""
+    global _log_queue
+    _log_queue = asyncio.Queue(maxsize=LOG_QUEUE_MAX)
+    return asyncio.create_task(_log_writer(_log_queue))
+
+
+async def _log_writer(queue: asyncio.Queue):
+    """Background task: drain the log queue and append batches to TRAFFIC_LOG.
+
+    Each batch is scrubbed, serialized and written in the default executor
+    so the event loop never waits on it.
+    """
+    global _log_fd
+    loop = asyncio.get_running_loop()
+    stopping = False
+    while not stopping:
+        batch = [await queue.get()]
+        while len(batch) < LOG_BATCH_MAX:
+            try:
+                batch.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        if None in batch:
+            stopping = True
+            batch = [e for e in batch if e is not None]
+        if not batch:
+            continue
+        try:
+            await loop.run_in_executor(None, _write_batch, batch)
+        except Exception:
+            pass  # Don't let logging failures break the proxy
+    if _log_fd is not None:
+        os.close(_log_fd)
+        _log_fd = None
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(create_app(), host="0.0.0.0", port=9090)
+    uvicorn.run(create_app(), host="0.0.0.0", port=9090, loop="uvloop", http="httptools", access_log=False)
@@ -12,19 +12,29 @@ Responsibilities:
 """
 
 import asyncio
+import base64
+import hashlib
+import hmac
 import json
 import os
 import re
 import secrets
 import shutil
 import subprocess
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
 
 import docker
+import jinja2
+import orjson
+import requests
 from fastapi import Cookie, Depends, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from starlette.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 
 import traffic_log
@@ -60,6 +70,30 @@ PREVIEWS_NGINX_DIR = PREVIEWS_DIR / "nginx"
 IS_LIMA_MODE = GATEWAY_CONTAINER == "local"
 
 
+# Shared Docker client, created on first use (each from_env() call opens a
+# new connection and negotiates the API version).
+_docker_client: Optional[docker.DockerClient] = None
+
+
+def _get_docker() -> docker.DockerClient:
+    """Return the shared Docker client, connecting on first use."""
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = docker.from_env()
+    return _docker_client
+
+
+def _reset_docker(e: Exception):
+    """Drop the shared client after a connection failure so the next call reconnects.
+
+    docker-py surfaces transport failures as requests exceptions, hence the
+    explicit requests dependency.
+    """
+    global _docker_client
+    if isinstance(e, requests.exceptions.ConnectionError):
+        _docker_client = None
+
+
 def gateway_stop():
     """Stop the gateway (systemd in Lima mode, Docker otherwise)."""
     if IS_LIMA_MODE:
@@ -68,9 +102,9 @@ def gateway_stop():
             capture_output=True, timeout=30
         )
     else:
-        client = docker.from_env()
-        container = client.containers.get(GATEWAY_CONTAINER)
+        container = _get_docker().containers.get(GATEWAY_CONTAINER)
         container.stop(timeout=30)
+    invalidate_gateway_status()
 
 
 def gateway_start():
@@ -81,11 +115,50 @@ def gateway_start():
             capture_output=True, timeout=30
         )
     else:
-        client = docker.from_env()
-        container = client.containers.get(GATEWAY_CONTAINER)
+        container = _get_docker().containers.get(GATEWAY_CONTAINER)
         container.start()
+    invalidate_gateway_status()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (bytes out, no separate encode step)."""
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+app = FastAPI(title="ClawFactory Controller", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Media types the controller streams chunk by chunk (SSE, NDJSON, raw
+# workspace files). Requests asking for them bypass gzip: older Starlette
+# GZip responders buffer the whole body (or don't exclude SSE), which would
+# stall these streams.
+STREAMED_ACCEPT = ("text/event-stream", "application/x-ndjson", "text/plain")
+
+
+class StreamingAwareGZip:
+    """GZipMiddleware, except for requests that ask for a streamed media type."""
+
+    def __init__(self, app, **options):
+        self.app = app
+        self.gzip = GZipMiddleware(app, **options)
 
-app = FastAPI(title="ClawFactory Controller", version="1.0.0")
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            accept = next((v for k, v in scope["headers"] if k == b"accept"), b"").decode("latin-1")
+            if scope["path"].endswith("/events") or any(t in accept for t in STREAMED_ACCEPT):
+                await self.app(scope, receive, send)
+                return
+        await self.gzip(scope, receive, send)
+
+
+# The dashboard HTML/CSS and JSON listings are repetitive and compress well
+app.add_middleware(StreamingAwareGZip, minimum_size=1024, compresslevel=6)
+
+# Dashboard CSS/JS assets (StaticFiles handles ETag / Last-Modified / 304)
+STATIC_DIR = Path(__file__).parent / "static"
+app.mount("/controller/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 # Temporal client (connected on startup)
 temporal_client = None
@@ -108,26 +181,64 @@ async def _connect_temporal():
 
 
 # Session storage (persisted to file)
+# sessions.json is a compacted snapshot; new sessions are appended to the
+# journal as one line each and folded into the snapshot once it grows.
 SESSIONS_FILE = Path("/srv/audit/sessions.json")
+SESSIONS_JOURNAL = Path("/srv/audit/sessions.journal")
+SESSIONS_JOURNAL_MAX = 1000
+
+_journal_entries = 0
 
 
 def load_sessions() -> set[str]:
-    """Load sessions from file."""
+    """Load sessions from the snapshot file, then replay the journal."""
+    global _journal_entries
+    sessions: set[str] = set()
+    _journal_entries = 0
     if SESSIONS_FILE.exists():
         try:
             with open(SESSIONS_FILE) as f:
                 data = json.load(f)
-                return set(data.get("sessions", []))
+                sessions = set(data.get("sessions", []))
         except Exception:
             pass
-    return set()
+    if SESSIONS_JOURNAL.exists():
+        try:
+            with open(SESSIONS_JOURNAL, "rb") as f:
+                for line in f:
+                    try:
+                        rec = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue  # Torn final line
+                    _journal_entries += 1
+                    sessions.add(rec["s"])
+        except Exception:
+            pass
+    return sessions
 
 
 def save_sessions(sessions: set[str]):
-    """Save sessions to file."""
+    """Write a compacted snapshot of all sessions and reset the journal."""
+    global _journal_entries
     SESSIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(SESSIONS_FILE, "w") as f:
-        json.dump({"sessions": list(sessions)}, f)
+    tmp = SESSIONS_FILE.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps({"sessions": list(sessions)}))
+    os.replace(tmp, SESSIONS_FILE)
+    SESSIONS_JOURNAL.unlink(missing_ok=True)
+    _journal_entries = 0
+
+
+def journal_session(session: str):
+    """Append a new session to the journal, compacting when it gets long."""
+    global _journal_entries
+    if _journal_entries >= SESSIONS_JOURNAL_MAX:
+        save_sessions(valid_sessions)
+        return
+    SESSIONS_JOURNAL.parent.mkdir(parents=True, exist_ok=True)
+    with open(SESSIONS_JOURNAL, "ab") as f:
+        f.write(orjson.dumps({"s": session}, option=orjson.OPT_APPEND_NEWLINE))
+    _journal_entries += 1
 
 
 valid_sessions: set[str] = load_sessions()
@@ -142,8 +253,8 @@ def log_startup():
         "event": "controller_started",
         "version": "1.0.0",
     }
-    with open(AUDIT_LOG, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    with open(AUDIT_LOG, "ab") as f:
+        f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
 
 
 log_startup()
@@ -153,18 +264,23 @@ log_startup()
 # Authentication
 # ============================================================
 
+def tokens_equal(supplied: str, expected: str) -> bool:
+    """Constant-time token comparison (on bytes, so non-ASCII input can't raise)."""
+    return hmac.compare_digest(supplied.encode("utf-8"), expected.encode("utf-8"))
+
+
 def verify_token(token: str) -> bool:
     """Verify the API token."""
     if not CONTROLLER_API_TOKEN:
         return True  # No token configured = no auth required
-    return secrets.compare_digest(token, CONTROLLER_API_TOKEN)
+    return tokens_equal(token, CONTROLLER_API_TOKEN)
 
 
 def create_session() -> str:
     """Create a new session token."""
     session = secrets.token_hex(32)
     valid_sessions.add(session)
-    save_sessions(valid_sessions)
+    journal_session(session)
     audit_log("session_created", {"session_prefix": session[:8]})
     return session
 
@@ -230,9 +346,9 @@ def check_internal_auth(
     if not actual_token:
         return False
 
-    if GATEWAY_INTERNAL_TOKEN and secrets.compare_digest(actual_token, GATEWAY_INTERNAL_TOKEN):
+    if GATEWAY_INTERNAL_TOKEN and tokens_equal(actual_token, GATEWAY_INTERNAL_TOKEN):
         return True
-    if CONTROLLER_API_TOKEN and secrets.compare_digest(actual_token, CONTROLLER_API_TOKEN):
+    if CONTROLLER_API_TOKEN and tokens_equal(actual_token, CONTROLLER_API_TOKEN):
         return True
 
     return False
@@ -261,7 +377,42 @@ def check_agent_auth(
     if not actual_token:
         return False
 
-    return secrets.compare_digest(actual_token, AGENT_API_TOKEN)
+    return tokens_equal(actual_token, AGENT_API_TOKEN)
+
+
+# agent_id -> write scope, rebuilt only when openclaw.json's mtime changes
+_agent_scope_cache: dict = {"mtime": None, "scopes": {}}
+
+
+def _load_agent_scopes() -> Optional[dict]:
+    """Return {agent_id: scope} from the live config, or None if it can't be read."""
+    config_path = OPENCLAW_HOME / "openclaw.json"
+    try:
+        mtime = config_path.stat().st_mtime
+        if mtime == _agent_scope_cache["mtime"]:
+            return _agent_scope_cache["scopes"]
+        cfg = orjson.loads(config_path.read_bytes())
+    except Exception:
+        return None
+
+    code_str = str(CODE_DIR)
+    scopes: dict = {}
+    for agent in cfg.get("agents", {}).get("list", []):
+        agent_id = agent.get("id")
+        if agent_id in scopes:
+            continue  # First entry wins
+        workspace = agent.get("workspace", "")
+        # Compute relative path within code dir
+        if workspace.startswith(code_str):
+            rel = workspace[len(code_str):].lstrip("/")
+            scopes[agent_id] = Path(rel) if rel else None  # workspace IS code dir → full access
+        else:
+            # Workspace not under code dir — use convention
+            scopes[agent_id] = Path(f"agents/{agent_id}")
+
+    _agent_scope_cache["mtime"] = mtime
+    _agent_scope_cache["scopes"] = scopes
+    return scopes
 
 
 def resolve_agent_file_scope(agent_id: str) -> Optional[Path]:
@@ -274,26 +425,12 @@ def resolve_agent_file_scope(agent_id: str) -> Optional[Path]:
     if not agent_id or agent_id in ("default", "main"):
         return None  # full access
 
-    # Read agents.list from live config
-    try:
-        with open(OPENCLAW_HOME / "openclaw.json") as f:
-            cfg = json.load(f)
-    except Exception:
+    # Read agents.list from live config (cached on mtime)
+    scopes = _load_agent_scopes()
+    if scopes is None:
         return Path(f"agents/{agent_id}")  # safe fallback
-
-    agents_list = cfg.get("agents", {}).get("list", [])
-    for agent in agents_list:
-        if agent.get("id") == agent_id:
-            workspace = agent.get("workspace", "")
-            # Compute relative path within code dir
-            code_str = str(CODE_DIR)
-            if workspace.startswith(code_str):
-                rel = workspace[len(code_str):].lstrip("/")
-                if rel:
-                    return Path(rel)
-                return None  # workspace IS code dir → full access
-            # Workspace not under code dir — use convention
-            return Path(f"agents/{agent_id}")
+    if agent_id in scopes:
+        return scopes[agent_id]
 
     # Unknown agent — restrict to agents/<id> by default
     return Path(f"agents/{agent_id}")
@@ -311,8 +448,8 @@ def audit_log(event: str, details: dict):
         **details,
     }
     AUDIT_LOG.parent.mkdir(parents=True, exist_ok=True)
-    with open(AUDIT_LOG, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    with open(AUDIT_LOG, "ab") as f:
+        f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE, default=str))
     print(f"[audit] {event}: {details}")
 
 
@@ -577,7 +714,60 @@ def _reconcile_previews():
 
 
 
+# Dashboard polling bursts share one status lookup per GATEWAY_STATUS_TTL
+GATEWAY_STATUS_TTL = 1.0
+# "gen" is bumped whenever the gateway is started or stopped; a lookup that
+# began before that is returned to its callers but not cached.
+_gateway_status_cache = {"status": "unknown", "at": 0.0, "gen": 0}
+_gateway_status_task: Optional[asyncio.Task] = None
+
+
+def invalidate_gateway_status():
+    """Forget the cached status and any lookup still in flight."""
+    global _gateway_status_task
+    _gateway_status_cache["gen"] += 1
+    _gateway_status_cache["at"] = 0.0
+    _gateway_status_task = None
+
+
 def get_gateway_status() -> str:
+    """Get gateway status, cached for GATEWAY_STATUS_TTL seconds."""
+    now = time.monotonic()
+    if now - _gateway_status_cache["at"] < GATEWAY_STATUS_TTL:
+        return _gateway_status_cache["status"]
+    gen = _gateway_status_cache["gen"]
+    status = _read_gateway_status()
+    if gen == _gateway_status_cache["gen"]:
+        _gateway_status_cache["status"] = status
+        _gateway_status_cache["at"] = now
+    return status
+
+
+async def _refresh_gateway_status() -> str:
+    global _gateway_status_task
+    try:
+        return await asyncio.to_thread(get_gateway_status)
+    finally:
+        # An invalidation may already have replaced this task
+        if _gateway_status_task is asyncio.current_task():
+            _gateway_status_task = None
+
+
+async def get_gateway_status_async() -> str:
+    """get_gateway_status() for async handlers, without blocking the event loop.
+
+    A fresh cached value is returned directly; otherwise the lookup runs in a
+    worker thread and concurrent callers share that one lookup.
+    """
+    global _gateway_status_task
+    if time.monotonic() - _gateway_status_cache["at"] < GATEWAY_STATUS_TTL:
+        return _gateway_status_cache["status"]
+    if _gateway_status_task is None:
+        _gateway_status_task = asyncio.create_task(_refresh_gateway_status())
+    return await asyncio.shield(_gateway_status_task)
+
+
+def _read_gateway_status() -> str:
     """Get gateway status (systemd in Lima mode, Docker otherwise)."""
     try:
         if IS_LIMA_MODE:
@@ -589,10 +779,10 @@ def get_gateway_status() -> str:
             # systemctl is-active returns: active, inactive, failed, activating, etc.
             return "running" if status == "active" else status or "unknown"
         else:
-            client = docker.from_env()
-            container = client.containers.get(GATEWAY_CONTAINER)
+            container = _get_docker().containers.get(GATEWAY_CONTAINER)
             return container.status
-    except Exception:
+    except Exception as e:
+        _reset_docker(e)
         return "unknown"
 
 
@@ -603,12 +793,13 @@ def restart_gateway() -> bool:
             gateway_stop()
             gateway_start()
         else:
-            client = docker.from_env()
-            container = client.containers.get(GATEWAY_CONTAINER)
+            container = _get_docker().containers.get(GATEWAY_CONTAINER)
             container.restart(timeout=30)
+            invalidate_gateway_status()
         audit_log("gateway_restart", {"container": GATEWAY_CONTAINER})
         return True
     except Exception as e:
+        _reset_docker(e)
         audit_log("gateway_restart_error", {"error": str(e)})
         return False
 
@@ -617,6 +808,190 @@ def restart_gateway() -> bool:
 # Dashboard UI
 # ============================================================
 
+# Favicon: factory with lobster claws
+_FAVICON_SVG = (
+    b"<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 64 64'>"
+    b"<rect x='12' y='28' width='40' height='28' fill='#455a64' rx='2'/>"
+    b"<rect x='16' y='32' width='8' height='10' fill='#90caf9'/>"
+    b"<rect x='28' y='32' width='8' height='10' fill='#90caf9'/>"
+    b"<rect x='40' y='32' width='8' height='10' fill='#90caf9'/>"
+    b"<rect x='20' y='20' width='24' height='10' fill='#546e7a'/>"
+    b"<rect x='30' y='8' width='8' height='14' fill='#607d8b'/>"
+    b"<ellipse cx='34' cy='6' rx='5' ry='3' fill='#ff5722'/>"
+    b"<path d='M8 38 Q2 32 8 26 L12 30 Q10 34 12 38 Z' fill='#e64a19'/>"
+    b"<path d='M4 34 Q-2 30 4 24' stroke='#ff7043' stroke-width='3' fill='none' stroke-linecap='round'/>"
+    b"<path d='M56 38 Q62 32 56 26 L52 30 Q54 34 52 38 Z' fill='#e64a19'/>"
+    b"<path d='M60 34 Q66 30 60 24' stroke='#ff7043' stroke-width='3' fill='none' stroke-linecap='round'/>"
+    b"<circle cx='6' cy='22' r='3' fill='#ff8a65'/>"
+    b"<circle cx='58' cy='22' r='3' fill='#ff8a65'/>"
+    b"<rect x='24' y='48' width='16' height='8' fill='#546e7a'/>"
+    b"</svg>"
+)
+
+# Page templates live in templates/ and are compiled once at import
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+_TEMPLATES = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=False,
+)
+_CONTROLLER_TMPL = _TEMPLATES.get_template("controller.html")
+
+# CodeMirror is loaded by the dashboard JS the first time an editor opens.
+# It uses the bundle from build-codemirror-bundle.sh when present, else the
+# CDN files. Both read the version and file lists from codemirror-assets.txt.
+def _load_codemirror_assets(path: Path) -> tuple[str, list[str], list[str]]:
+    """(version, css files, js files) from the shared CodeMirror asset list."""
+    version, files = "", {"css": [], "js": []}
+    for line in path.read_text().splitlines():
+        kind, _, value = line.strip().partition(" ")
+        if kind == "version":
+            version = value.strip()
+        elif kind in files:
+            files[kind].append(value.strip())
+    return version, files["css"], files["js"]
+
+
+_CODEMIRROR_VERSION, _CODEMIRROR_CSS, _CODEMIRROR_JS = _load_codemirror_assets(
+    Path(__file__).parent / "codemirror-assets.txt"
+)
+_CODEMIRROR_CDN = f"https://cdnjs.cloudflare.com/ajax/libs/codemirror/{_CODEMIRROR_VERSION}"
+_CODEMIRROR_BUNDLE = STATIC_DIR / "codemirror-bundle.min.js"
+if _CODEMIRROR_BUNDLE.exists() and (STATIC_DIR / "codemirror-bundle.min.css").exists():
+    _CODEMIRROR_ASSETS = {
+        "css": ["/controller/static/codemirror-bundle.min.css"],
+        "js": [{
+            "src": "/controller/static/codemirror-bundle.min.js",
+            "integrity": "sha384-" + base64.b64encode(hashlib.sha384(_CODEMIRROR_BUNDLE.read_bytes()).digest()).decode(),
+        }],
+    }
+else:
+    _CODEMIRROR_ASSETS = {
+        "css": [f"{_CODEMIRROR_CDN}/{f}" for f in _CODEMIRROR_CSS],
+        "js": [{"src": f"{_CODEMIRROR_CDN}/{f}"} for f in _CODEMIRROR_JS],
+    }
+_TEMPLATES.globals["codemirror_assets"] = _CODEMIRROR_ASSETS
+
+# Everything in the dashboard except gateway_status is fixed per process, so
+# the page ETag is this seed plus the current status.
+_CONTROLLER_ETAG_SEED = hashlib.blake2b(
+    b"".join(p.read_bytes() for p in sorted(TEMPLATES_DIR.rglob("*.html")))
+    + f"{INSTANCE_NAME}|{GATEWAY_PORT}|{IS_LIMA_MODE}|{_CODEMIRROR_ASSETS}".encode(),
+    digest_size=8,
+).hexdigest()
+
+# Dashboard stat colour for each gateway status (anything else is an error)
+_GATEWAY_CLASS = {"running": "success", "unknown": "warning"}
+
+# The login page only depends on INSTANCE_NAME, so it is rendered once
+_LOGIN_BYTES = _TEMPLATES.get_template("login.html").render(INSTANCE_NAME=INSTANCE_NAME).encode("utf-8")
+
+# Non-dashboard pages are fetched by the shell on first visit. None of them
+# depend on gateway status, so they are rendered once and share one ETag
+# (logs also carries its initial data, see page_fragment).
+_PAGE_FRAGMENTS = {
+    path.stem: _TEMPLATES.get_template(f"pages/{path.name}").render(
+        INSTANCE_NAME=INSTANCE_NAME,
+        GATEWAY_PORT=GATEWAY_PORT,
+        runtime_mode="Lima" if IS_LIMA_MODE else "Docker",
+    ).encode("utf-8")
+    for path in sorted((TEMPLATES_DIR / "pages").glob("*.html"))
+}
+_PAGE_ETAG = f'W/"{_CONTROLLER_ETAG_SEED}"'
+
+# Rendered dashboard per gateway status: (etag, html bytes). The status is
+# the only per-request input and takes a handful of values.
+_controller_pages: dict[str, tuple[str, bytes]] = {}
+
+
+def _render_controller(gateway_status: str) -> tuple[str, bytes]:
+    """Return the dashboard ETag and HTML for gateway_status, rendering once."""
+    page = _controller_pages.get(gateway_status)
+    if page is None:
+        etag = 'W/"' + hashlib.blake2b(f"{_CONTROLLER_ETAG_SEED}|{gateway_status}".encode(), digest_size=8).hexdigest() + '"'
+        html = _CONTROLLER_TMPL.render(
+            INSTANCE_NAME=INSTANCE_NAME,
+            GATEWAY_PORT=GATEWAY_PORT,
+            gateway_status=gateway_status,
+            gateway_class=_GATEWAY_CLASS.get(gateway_status, "error"),
+            runtime_mode="Lima" if IS_LIMA_MODE else "Docker",
+            ollama_base_url="http://host.lima.internal:11434/v1" if IS_LIMA_MODE else "http://host.docker.internal:11434/v1",
+        ).encode("utf-8")
+        page = _controller_pages[gateway_status] = (etag, html)
+    return page
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header covers etag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))
+
+
+@app.get("/favicon.svg")
+@app.get("/controller/favicon.svg")
+async def favicon():
+    """Dashboard favicon (long-lived browser cache)."""
+    return Response(
+        _FAVICON_SVG,
+        media_type="image/svg+xml",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+# Characters that can end or re-mode a <script> element. In JSON they only
+# occur inside strings, where the \u escapes decode to the same text.
+_SCRIPT_UNSAFE = ((b"&", b"\\u0026"), (b"<", b"\\u003c"), (b">", b"\\u003e"))
+
+
+def script_safe_json(payload) -> bytes:
+    """orjson-encode payload for embedding in a <script type="application/json">."""
+    data = orjson.dumps(payload, default=str)
+    for char, escape in _SCRIPT_UNSAFE:
+        data = data.replace(char, escape)
+    return data
+
+
+@app.get("/page/{name}")
+@app.get("/controller/page/{name}")
+async def page_fragment(
+    name: str,
+    request: Request,
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """HTML for one dashboard page, loaded lazily by the UI shell."""
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    fragment = _PAGE_FRAGMENTS.get(name)
+    if fragment is None:
+        raise HTTPException(status_code=404, detail="Unknown page")
+
+    if name == "logs":
+        # The first traffic page (table columns only; bodies stay behind
+        # /traffic/{id}) and capture state ride along, so the Logs page
+        # renders without two more round trips (see initLogsPage).
+        entries, capture = await asyncio.gather(
+            asyncio.to_thread(traffic_log.read_traffic_log, limit=50, offset=0),
+            asyncio.to_thread(capture_status),
+        )
+        rows = [traffic_row(e) for e in entries]
+        initial = script_safe_json({"entries": rows, "capture": capture})
+        return Response(
+            fragment + b'<script type="application/json" id="logs-initial">' + initial + b"</script>",
+            media_type="text/html; charset=utf-8",
+            headers={"Cache-Control": "private, no-cache"},
+        )
+
+    cache_headers = {"ETag": _PAGE_ETAG, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, _PAGE_ETAG):
+        return Response(status_code=304, headers=cache_headers)
+    return Response(fragment, media_type="text/html; charset=utf-8", headers=cache_headers)
+
+
 @app.get("/controller", response_class=HTMLResponse)
 async def promote_ui(
     request: Request,
@@ -633,2729 +1008,18 @@ async def promote_ui(
             auth_result = "set_session"
         else:
             # Show login page
-            return HTMLResponse(f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <title>ClawFactory - Login</title>
-                    <link rel="icon" type="image/svg+xml" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 64 64'><rect x='12' y='28' width='40' height='28' fill='%23455a64' rx='2'/><rect x='16' y='32' width='8' height='10' fill='%2390caf9'/><rect x='28' y='32' width='8' height='10' fill='%2390caf9'/><rect x='40' y='32' width='8' height='10' fill='%2390caf9'/><rect x='20' y='20' width='24' height='10' fill='%23546e7a'/><rect x='30' y='8' width='8' height='14' fill='%23607d8b'/><ellipse cx='34' cy='6' rx='5' ry='3' fill='%23ff5722'/><path d='M8 38 Q2 32 8 26 L12 30 Q10 34 12 38 Z' fill='%23e64a19'/><path d='M4 34 Q-2 30 4 24' stroke='%23ff7043' stroke-width='3' fill='none' stroke-linecap='round'/><path d='M56 38 Q62 32 56 26 L52 30 Q54 34 52 38 Z' fill='%23e64a19'/><path d='M60 34 Q66 30 60 24' stroke='%23ff7043' stroke-width='3' fill='none' stroke-linecap='round'/><circle cx='6' cy='22' r='3' fill='%23ff8a65'/><circle cx='58' cy='22' r='3' fill='%23ff8a65'/><rect x='24' y='48' width='16' height='8' fill='%23546e7a'/></svg>">
-                    <style>
-                        body {{ font-family: monospace; padding: 2rem; background: #1a1a1a; color: #e0e0e0; }}
-                        h1 {{ color: #4CAF50; }}
-                        input {{ padding: 0.5rem; font-family: monospace; width: 400px; }}
-                        button {{ background: #4CAF50; color: white; border: none; padding: 0.5rem 1rem; cursor: pointer; }}
-                    </style>
-                </head>
-                <body>
-                    <h1>ClawFactory <span style="color: #2196F3">[{INSTANCE_NAME}]</span></h1>
-                    <p>Authentication required.</p>
-                    <form method="GET" action="/controller">
-                        <input type="password" name="token" placeholder="Enter API token" autofocus>
-                        <button type="submit">Login</button>
-                    </form>
-                </body>
-                </html>
-            """, status_code=401)
+            return Response(_LOGIN_BYTES, status_code=401, media_type="text/html; charset=utf-8")
 
     # Get gateway status
-    gateway_status = get_gateway_status()
-    gateway_class = "success" if gateway_status == "running" else ("warning" if gateway_status == "unknown" else "error")
-
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>ClawFactory [{INSTANCE_NAME}]</title>
-        <!-- Favicon: Factory with lobster claws -->
-        <link rel="icon" type="image/svg+xml" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 64 64'><rect x='12' y='28' width='40' height='28' fill='%23455a64' rx='2'/><rect x='16' y='32' width='8' height='10' fill='%2390caf9'/><rect x='28' y='32' width='8' height='10' fill='%2390caf9'/><rect x='40' y='32' width='8' height='10' fill='%2390caf9'/><rect x='20' y='20' width='24' height='10' fill='%23546e7a'/><rect x='30' y='8' width='8' height='14' fill='%23607d8b'/><ellipse cx='34' cy='6' rx='5' ry='3' fill='%23ff5722'/><path d='M8 38 Q2 32 8 26 L12 30 Q10 34 12 38 Z' fill='%23e64a19'/><path d='M4 34 Q-2 30 4 24' stroke='%23ff7043' stroke-width='3' fill='none' stroke-linecap='round'/><path d='M56 38 Q62 32 56 26 L52 30 Q54 34 52 38 Z' fill='%23e64a19'/><path d='M60 34 Q66 30 60 24' stroke='%23ff7043' stroke-width='3' fill='none' stroke-linecap='round'/><circle cx='6' cy='22' r='3' fill='%23ff8a65'/><circle cx='58' cy='22' r='3' fill='%23ff8a65'/><rect x='24' y='48' width='16' height='8' fill='%23546e7a'/></svg>">
-        <!-- CodeMirror for JSON editing -->
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/codemirror.min.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/theme/material-darker.min.css">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/fold/foldgutter.min.css">
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/codemirror.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/javascript/javascript.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/edit/matchbrackets.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/edit/closebrackets.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/fold/foldcode.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/fold/foldgutter.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/fold/brace-fold.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/addon/search/searchcursor.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/yaml/yaml.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/markdown/markdown.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/python/python.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/shell/shell.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/toml/toml.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/css/css.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/htmlmixed/htmlmixed.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/codemirror/5.65.16/mode/xml/xml.min.js"></script>
-        <style>
-            * {{ box-sizing: border-box; }}
-            body {{ font-family: monospace; padding: 0; background: #1a1a1a; color: #e0e0e0; margin: 0; display: flex; min-height: 100vh; }}
-            #sidebar {{ width: 220px; min-width: 220px; background: #151515; border-right: 1px solid #333; padding: 1rem 0; position: fixed; top: 0; left: 0; bottom: 0; overflow-y: auto; z-index: 100; }}
-            #sidebar .brand {{ padding: 0.75rem 1rem; font-size: 1.2rem; color: #4CAF50; font-weight: bold; border-bottom: 1px solid #333; margin-bottom: 0.5rem; }}
-            #sidebar .brand span {{ color: #2196F3; font-size: 0.9rem; }}
-            #sidebar a {{ display: block; padding: 0.6rem 1rem; color: #888; text-decoration: none; border-left: 3px solid transparent; }}
-            #sidebar a:hover {{ background: #1e1e1e; color: #e0e0e0; }}
-            #sidebar a.active {{ color: #4CAF50; border-left-color: #4CAF50; background: #1a2a1a; }}
-            #content {{ margin-left: 220px; flex: 1; padding: 1rem 1.5rem; overflow-y: auto; max-width: 1200px; }}
-            .page {{ display: none; }}
-            .page.active {{ display: block; }}
-            h1 {{ color: #4CAF50; margin-bottom: 0.5rem; font-size: 1.5rem; }}
-            h2 {{ color: #888; font-size: 1rem; margin-top: 1.5rem; border-bottom: 1px solid #333; padding-bottom: 0.5rem; }}
-            h3 {{ color: #666; font-size: 0.9rem; margin: 1rem 0 0.5rem 0; }}
-            pre {{ background: #2d2d2d; padding: 0.75rem; overflow-x: auto; max-height: 250px; overflow-y: auto; font-size: 0.85rem; word-break: break-all; white-space: pre-wrap; }}
-            button {{ background: #4CAF50; color: white; border: none; padding: 0.6rem 1rem;
-                     font-size: 0.9rem; cursor: pointer; margin: 0.3rem 0.3rem 0.3rem 0; font-family: monospace; border-radius: 4px; }}
-            button:hover {{ background: #45a049; }}
-            button.secondary {{ background: #2196F3; }}
-            button.secondary:hover {{ background: #1976D2; }}
-            button.danger {{ background: #f44336; }}
-            button.danger:hover {{ background: #d32f2f; }}
-            @keyframes pulse {{ 0%, 100% {{ opacity: 1; }} 50% {{ opacity: 0.7; }} }}
-            button.small {{ padding: 0.4rem 0.6rem; font-size: 0.8rem; }}
-            input {{ padding: 0.5rem; font-family: monospace; background: #2d2d2d; border: 1px solid #444; color: #e0e0e0; border-radius: 4px; width: 100%; max-width: 300px; }}
-            .grid {{ display: grid; grid-template-columns: 1fr 1fr; gap: 1.5rem; }}
-            .card {{ background: #252525; padding: 1rem; border-radius: 4px; }}
-            .status {{ display: inline-block; padding: 0.25rem 0.5rem; border-radius: 3px; font-size: 0.85rem; }}
-            .success {{ background: #1b5e20; color: #a5d6a7; }}
-            .warning {{ background: #e65100; color: #ffcc80; }}
-            .error {{ background: #b71c1c; color: #ef9a9a; }}
-            .sha {{ color: #2196F3; font-family: monospace; }}
-            .result {{ margin-top: 1rem; padding: 0.75rem; background: #2d2d2d; border-left: 3px solid #4CAF50; display: none; font-size: 0.85rem; }}
-            .result.error {{ border-left-color: #f44336; }}
-            .stats {{ display: flex; gap: 1rem; margin: 1rem 0; flex-wrap: wrap; }}
-            .stat {{ text-align: center; min-width: 80px; }}
-            .stat-value {{ font-size: 1.2rem; color: #4CAF50; }}
-            .stat-label {{ font-size: 0.75rem; color: #888; }}
-            a {{ color: #2196F3; }}
-            #audit-log {{ max-height: 300px; overflow-y: auto; }}
-            .pending-item {{ background: #333; padding: 0.5rem; margin: 0.5rem 0; border-radius: 4px; display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 0.5rem; max-width: 100%; overflow: hidden; box-sizing: border-box; }}
-            .pending-item-info {{ flex: 1; min-width: 0; overflow: hidden; text-overflow: ellipsis; }}
-            .pending-item-info strong, .pending-item-info small {{ display: block; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }}
-            .pending-item-actions {{ display: flex; gap: 0.3rem; flex-shrink: 0; }}
-            .tab-buttons {{ display: flex; gap: 0.5rem; margin-bottom: 1rem; flex-wrap: wrap; }}
-            .tab-button {{ background: #333; border: none; padding: 0.5rem 1rem; color: #888; cursor: pointer; border-radius: 4px 4px 0 0; }}
-            .tab-button.active {{ background: #252525; color: #4CAF50; }}
-            .tab-content {{ display: none; }}
-            .tab-content.active {{ display: block; }}
-            /* Diff syntax highlighting */
-            .diff-view {{ font-family: monospace; font-size: 0.75rem; line-height: 1.4; }}
-            .diff-view .diff-header {{ color: #61afef; font-weight: bold; }}
-            .diff-view .diff-file {{ color: #e5c07b; font-weight: bold; }}
-            .diff-view .diff-hunk {{ color: #c678dd; }}
-            .diff-view .diff-add {{ color: #98c379; background: rgba(152, 195, 121, 0.1); }}
-            .diff-view .diff-del {{ color: #e06c75; background: rgba(224, 108, 117, 0.1); }}
-            .diff-view .diff-context {{ color: #abb2bf; }}
-            /* CodeMirror customizations */
-            .CodeMirror {{ height: 400px; font-size: 0.8rem; border: 1px solid #444; border-radius: 4px; }}
-            .CodeMirror-gutters {{ background: #1e1e1e; border-right: 1px solid #333; }}
-            .CodeMirror-linenumber {{ color: #5c6370; }}
-            /* Traffic table styles */
-            .traffic-table {{ width: 100%; border-collapse: collapse; font-size: 0.8rem; }}
-            .traffic-table th {{ text-align: left; padding: 0.5rem; border-bottom: 2px solid #444; color: #888; }}
-            .traffic-table td {{ padding: 0.5rem; border-bottom: 1px solid #333; }}
-            .traffic-table tr:hover {{ background: #252525; }}
-            .traffic-table .provider {{ font-weight: bold; }}
-            .traffic-table .provider-anthropic {{ color: #d4a574; }}
-            .traffic-table .provider-openai {{ color: #74b9ff; }}
-            .traffic-table .provider-gemini {{ color: #a29bfe; }}
-            .traffic-detail {{ background: #1e1e1e; padding: 1rem; border-radius: 4px; margin-top: 0.5rem; }}
-            .traffic-detail pre {{ max-height: 400px; overflow: auto; }}
-            .sub-tabs {{ display: flex; gap: 0; border-bottom: 1px solid #444; margin-bottom: 1rem; }}
-            .sub-tab {{ background: none; border: none; padding: 0.5rem 1rem; color: #888; cursor: pointer; border-bottom: 2px solid transparent; border-radius: 0; font-family: monospace; }}
-            .sub-tab:hover {{ color: #e0e0e0; }}
-            .sub-tab.active {{ color: #4CAF50; border-bottom-color: #4CAF50; }}
-            .sub-content {{ display: none; }}
-            .sub-content.active {{ display: block; }}
-            .scrub-rule {{ background: #252525; padding: 0.75rem; border-radius: 4px; margin-bottom: 0.5rem; border: 1px solid #333; }}
-            .scrub-rule.builtin {{ border-left: 3px solid #2196F3; }}
-            /* Mobile responsive */
-            @media (max-width: 768px) {{
-                #sidebar {{ display: none; }}
-                #content {{ margin-left: 0; padding: 0.75rem; }}
-                .grid {{ grid-template-columns: 1fr; gap: 1rem; }}
-                .stats {{ justify-content: space-around; }}
-                button {{ padding: 0.5rem 0.8rem; font-size: 0.85rem; }}
-                input {{ max-width: 100%; }}
-                pre {{ font-size: 0.75rem; max-height: 200px; }}
-            }}
-        </style>
-    </head>
-    <body>
-        <nav id="sidebar">
-            <div class="brand">ClawFactory <span>[{INSTANCE_NAME}]</span></div>
-            <a href="#dashboard" class="active" onclick="switchPage('dashboard')">Dashboard</a>
-            <a href="#gateway" onclick="switchPage('gateway')">Gateway</a>
-            <a href="#logs" onclick="switchPage('logs')">Logs</a>
-            <a href="#ports" onclick="switchPage('ports')">Ports</a>
-            <a href="#snapshots" onclick="switchPage('snapshots')">Snapshots</a>
-            <a href="#settings" onclick="switchPage('settings')">Settings</a>
-            <a href="http://localhost:8082" target="_blank">Temporal &#8599;</a>
-        </nav>
-
-        <main id="content">
-        <!-- ==================== DASHBOARD PAGE ==================== -->
-        <div id="page-dashboard" class="page active">
-        <h1>Dashboard</h1>
-
-        <div class="stats">
-            <div class="stat">
-                <div class="stat-value {gateway_class}">
-                    <span id="gateway-status-indicator" class="status-dot"></span>
-                    <a href="http://localhost:{GATEWAY_PORT}" target="_blank" style="color: inherit; text-decoration: none;" title="Open Gateway on port {GATEWAY_PORT}">{gateway_status}</a>
-                </div>
-                <div class="stat-label">Gateway <a href="http://localhost:{GATEWAY_PORT}" target="_blank" style="color: #2196F3; text-decoration: none;">:{GATEWAY_PORT}</a> <span id="gateway-last-update" style="font-size: 0.7rem; color: #666;"></span></div>
-            </div>
-        </div>
-
-        <div class="grid">
-            <div>
-                <h2>Controls</h2>
-                <div class="card">
-                    <div style="display: flex; gap: 0.5rem; flex-wrap: wrap; margin-bottom: 1rem;">
-                        <button onclick="pullUpstream()">Pull Latest OpenClaw</button>
-                        <button onclick="rebuildGateway()" class="secondary">Rebuild Gateway</button>
-                        <button onclick="restartGateway()" class="danger">Restart Gateway</button>
-                        <button onclick="killswitch()" class="danger" style="background: #b71c1c;">Killswitch</button>
-                    </div>
-                    <div id="promote-result" class="result"></div>
-                </div>
-            </div>
-        </div>
-        </div><!-- /page-dashboard -->
-
-        <!-- ==================== GATEWAY PAGE ==================== -->
-        <div id="page-gateway" class="page">
-        <h1>Gateway <a href="http://localhost:{GATEWAY_PORT}" target="_blank" style="color: #2196F3; font-size: 0.8rem; text-decoration: none;">:{GATEWAY_PORT}</a></h1>
-
-        <h2>System Controls</h2>
-        <div class="card">
-            <button onclick="restartGateway()" class="danger">Restart Gateway</button>
-            <div id="gateway-system-result" class="result"></div>
-        </div>
-
-        <h2>Gateway Config</h2>
-        <div class="card">
-            <p style="color: #888; font-size: 0.85rem;">Edit openclaw.json. Save will stop gateway, apply changes, and restart.</p>
-            <div style="margin-bottom: 0.5rem;">
-                <label style="color: #888; font-size: 0.85rem;">Available RAM for Ollama: </label>
-                <input type="number" id="available-ram" value="64" min="8" max="512" style="width: 60px; padding: 0.3rem; background: #2d2d2d; border: 1px solid #444; color: #e0e0e0; border-radius: 4px;">
-                <span style="color: #888; font-size: 0.85rem;">GB</span>
-                <span style="color: #666; font-size: 0.75rem; margin-left: 1rem;">(used to calculate safe context windows)</span>
-            </div>
-            <button onclick="loadConfig()">Load Config</button>
-            <button onclick="validateConfig()" class="secondary">Validate</button>
-            <button onclick="saveConfig()" class="danger">Save &amp; Restart</button>
-            <button onclick="formatConfig()" class="secondary">Format JSON</button>
-            <button id="revert-config-btn" onclick="revertConfig()" class="secondary" style="display: none;">Revert to Backup</button>
-            <div id="config-result" class="result"></div>
-            <div id="ollama-models" style="margin-top: 0.5rem;"></div>
-            <div style="display: flex; justify-content: space-between; margin-top: 0.5rem; font-size: 0.75rem; color: #888;">
-                <span id="cursor-pos">Line 1, Col 1</span>
-                <span id="json-status"></span>
-            </div>
-            <textarea id="config-editor-raw" style="display: none;"></textarea>
-            <div id="config-editor-wrapper" style="margin-top: 0.25rem;"></div>
-        </div>
-
-        <h2>Gateway Pairing</h2>
-        <div class="card">
-            <p style="color: #888; font-size: 0.85rem; margin-bottom: 1rem;">
-                Manage device connections and DM pairing across all channels.
-            </p>
-
-            <div class="tab-buttons" style="margin-bottom: 1rem;">
-                <button class="tab-button active" onclick="showTab('devices')">Devices</button>
-                <button class="tab-button" onclick="showTab('channels')">Channels</button>
-            </div>
-
-            <div id="tab-devices" class="tab-content active">
-                <p style="color: #888; font-size: 0.85rem;">iOS, Android, and browser clients connecting to this gateway.</p>
-                <button onclick="fetchDevices()" class="secondary">Refresh</button>
-                <div id="devices-list" style="margin-top: 0.5rem;"></div>
-                <div id="devices-result" class="result"></div>
-            </div>
-
-            <div id="tab-channels" class="tab-content">
-                <p style="color: #888; font-size: 0.85rem;">DM pairing for messaging channels. Users send a pairing code to start chatting.</p>
-
-                <div style="display: flex; gap: 0.5rem; flex-wrap: wrap; margin-bottom: 1rem;">
-                    <button onclick="refreshAllChannels()" class="secondary">Refresh All</button>
-                </div>
-
-                <div id="channels-grid" style="display: grid; grid-template-columns: repeat(auto-fit, minmax(280px, 1fr)); gap: 1rem;">
-                    <div class="channel-card" data-channel="discord">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                            <strong style="color: #5865F2;">Discord</strong>
-                            <span id="discord-status" class="channel-status" style="font-size: 0.75rem; color: #888;">--</span>
-                        </div>
-                        <div id="discord-pending" style="font-size: 0.85rem; color: #888;">Click refresh to load</div>
-                        <button onclick="fetchChannelPairing('discord')" class="small secondary" style="margin-top: 0.5rem;">Refresh</button>
-                    </div>
-
-                    <div class="channel-card" data-channel="telegram">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                            <strong style="color: #0088cc;">Telegram</strong>
-                            <span id="telegram-status" class="channel-status" style="font-size: 0.75rem; color: #888;">--</span>
-                        </div>
-                        <div id="telegram-pending" style="font-size: 0.85rem; color: #888;">Click refresh to load</div>
-                        <button onclick="fetchChannelPairing('telegram')" class="small secondary" style="margin-top: 0.5rem;">Refresh</button>
-                    </div>
-
-                    <div class="channel-card" data-channel="slack">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                            <strong style="color: #E01E5A;">Slack</strong>
-                            <span id="slack-status" class="channel-status" style="font-size: 0.75rem; color: #888;">--</span>
-                        </div>
-                        <div id="slack-pending" style="font-size: 0.85rem; color: #888;">Click refresh to load</div>
-                        <button onclick="fetchChannelPairing('slack')" class="small secondary" style="margin-top: 0.5rem;">Refresh</button>
-                    </div>
-                </div>
-
-                <div style="margin-top: 1.5rem; padding-top: 1rem; border-top: 1px solid #333;">
-                    <h3 style="margin: 0 0 0.5rem 0; font-size: 0.9rem; color: #888;">Approve Pairing Code</h3>
-                    <div style="display: flex; gap: 0.5rem; flex-wrap: wrap; align-items: center;">
-                        <select id="pairing-channel" style="padding: 0.5rem; background: #2d2d2d; border: 1px solid #444; color: #e0e0e0; border-radius: 4px;">
-                            <option value="discord">Discord</option>
-                            <option value="telegram">Telegram</option>
-                            <option value="slack">Slack</option>
-                        </select>
-                        <input type="text" id="pairing-code" placeholder="ABCD1234" style="width: 120px; text-transform: uppercase;">
-                        <button onclick="approvePairingCode()">Approve</button>
-                    </div>
-                    <div id="pairing-result" class="result"></div>
-                </div>
-            </div>
-        </div>
-        </div><!-- /page-gateway -->
-
-        <!-- ==================== LOGS PAGE ==================== -->
-        <div id="page-logs" class="page">
-        <h1>Logs</h1>
-
-        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-            <div class="sub-tabs" style="margin-bottom: 0;">
-                <button class="sub-tab active" onclick="switchSubTab('traffic')">Traffic</button>
-                <button class="sub-tab" onclick="switchSubTab('llm-sessions')">LLM Sessions</button>
-                <button class="sub-tab" onclick="switchSubTab('audit')">Audit</button>
-                <button class="sub-tab" onclick="switchSubTab('gateway-stdout')">Gateway Stdout</button>
-                <button class="sub-tab" onclick="switchSubTab('scrub-rules')">Scrub Rules</button>
-            </div>
-            <div style="display: flex; align-items: center; gap: 0.5rem;">
-                <span id="capture-status-dot" style="width: 8px; height: 8px; border-radius: 50%; background: #666; display: inline-block;"></span>
-                <span id="capture-status-text" style="font-size: 0.8rem; color: #888;">MITM Capture: --</span>
-                <span id="capture-entry-count" style="font-size: 0.75rem; color: #666;"></span>
-                <button id="capture-toggle-btn" onclick="toggleCapture()" class="small" style="font-size: 0.75rem;">--</button>
-            </div>
-        </div>
-
-        <!-- Traffic sub-tab -->
-        <div id="sub-traffic" class="sub-content active">
-            <div style="display: flex; gap: 0.5rem; flex-wrap: wrap; align-items: center; margin-bottom: 1rem;">
-                <select id="traffic-provider-filter" style="padding: 0.4rem; background: #2d2d2d; border: 1px solid #444; color: #e0e0e0; border-radius: 4px;">
-                    <option value="">All Providers</option>
-                </select>
-                <input type="text" id="traffic-search" placeholder="Search..." style="width: 200px; padding: 0.4rem;">
-                <button onclick="fetchTraffic()" class="secondary small">Search</button>
-                <button onclick="decryptTraffic()" class="small" style="background: #1565C0;">Decrypt &amp; View</button>
-                <button onclick="fetchTrafficStats()" class="secondary small">Stats</button>
-                <button onclick="deleteTrafficLogs()" class="small danger">Delete Logs</button>
-            </div>
-            <div id="traffic-stats" style="display: none; margin-bottom: 1rem;"></div>
-            <div id="traffic-table-container">
-                <p style="color: #888;">Click Search to load proxy traffic, or Decrypt &amp; View for MITM-captured traffic.</p>
-            </div>
-            <div id="traffic-detail" style="display: none;"></div>
-        </div>
-
-        <!-- LLM Sessions sub-tab -->
-        <div id="sub-llm-sessions" class="sub-content">
-            <p style="color: #888; font-size: 0.85rem;">Click on a traffic entry to view full request/response details.</p>
-            <div id="llm-session-detail" style="margin-top: 1rem;">
-                <p style="color: #888;">Select a traffic entry from the Traffic tab to view session details.</p>
-            </div>
-        </div>
-
-        <!-- Audit sub-tab -->
-        <div id="sub-audit" class="sub-content">
-            <button onclick="fetchAudit()">Refresh</button>
-            <button onclick="fetchAudit(100)" class="secondary">Last 100</button>
-            <pre id="audit-log" style="margin-top: 0.5rem;">Click Refresh to load audit log...</pre>
-        </div>
-
-        <!-- Gateway Stdout sub-tab -->
-        <div id="sub-gateway-stdout" class="sub-content">
-            <button onclick="fetchGatewayLogs()">Refresh</button>
-            <button onclick="fetchGatewayLogs(200)" class="secondary">Last 200</button>
-            <button onclick="fetchGatewayLogs(500)" class="secondary">Last 500</button>
-            <label style="margin-left: 1rem; color: #888;">
-                <input type="checkbox" id="logs-auto-refresh" onchange="toggleLogsAutoRefresh()"> Auto-refresh
-            </label>
-            <pre id="gateway-logs" style="max-height: 500px; overflow-y: auto; font-size: 0.8rem; margin-top: 0.5rem;">Click Refresh to load gateway logs...</pre>
-        </div>
-
-        <!-- Scrub Rules sub-tab -->
-        <div id="sub-scrub-rules" class="sub-content">
-            <p style="color: #888; font-size: 0.85rem; margin-bottom: 1rem;">
-                Regex patterns applied to scrub sensitive data from traffic logs before they're written to disk.
-            </p>
-            <button onclick="fetchScrubRules()">Load Rules</button>
-            <button onclick="saveScrubRules()" class="secondary">Save Rules</button>
-            <div id="scrub-rules-list" style="margin-top: 1rem;">
-                <p style="color: #888;">Click Load Rules to view current scrub rules.</p>
-            </div>
-
-            <div style="margin-top: 1.5rem; padding-top: 1rem; border-top: 1px solid #333;">
-                <h3 style="margin: 0 0 0.5rem 0;">Add Custom Rule</h3>
-                <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 0.5rem;">
-                    <div>
-                        <label style="color: #888; font-size: 0.85rem;">Name:</label>
-                        <input type="text" id="scrub-rule-name" placeholder="My Rule" style="width: 100%;">
-                    </div>
-                    <div>
-                        <label style="color: #888; font-size: 0.85rem;">ID:</label>
-                        <input type="text" id="scrub-rule-id" placeholder="my-rule" style="width: 100%;">
-                    </div>
-                    <div style="grid-column: 1 / -1;">
-                        <label style="color: #888; font-size: 0.85rem;">Pattern (regex):</label>
-                        <input type="text" id="scrub-rule-pattern" placeholder="secret_[A-Za-z0-9]+" style="width: 100%;">
-                    </div>
-                    <div style="grid-column: 1 / -1;">
-                        <label style="color: #888; font-size: 0.85rem;">Replacement:</label>
-                        <input type="text" id="scrub-rule-replacement" value="***REDACTED***" style="width: 100%;">
-                    </div>
-                </div>
-                <div style="margin-top: 0.5rem; display: flex; gap: 0.5rem;">
-                    <button onclick="addScrubRule()" class="small">Add Rule</button>
-                    <button onclick="testScrubRuleUI()" class="small secondary">Test Pattern</button>
-                </div>
-                <div style="margin-top: 0.5rem;">
-                    <label style="color: #888; font-size: 0.85rem;">Test sample:</label>
-                    <input type="text" id="scrub-test-sample" placeholder="Enter text to test against..." style="width: 100%;">
-                </div>
-                <div id="scrub-test-result" class="result" style="margin-top: 0.5rem;"></div>
-            </div>
-        </div>
-
-        </div><!-- /page-logs -->
-
-        <!-- ==================== PORTS PAGE ==================== -->
-        <div id="page-ports" class="page">
-        <h1>Ports</h1>
-
-        <h2>Preview Passthrough</h2>
-        <div class="card">
-            <p style="color: #888; font-size: 0.85rem;">Register a localhost server as an unauthenticated preview path. The app behind the port should enforce its own auth when needed.</p>
-            <div style="display: grid; grid-template-columns: 120px 1fr 1fr auto; gap: 0.5rem; align-items: end;">
-                <div>
-                    <label style="color: #888; font-size: 0.85rem;">Port</label>
-                    <input type="number" id="preview-port-input" min="1024" max="65535" placeholder="6969" style="width: 100%;">
-                </div>
-                <div>
-                    <label style="color: #888; font-size: 0.85rem;">Path alias</label>
-                    <input type="text" id="preview-alias-input" placeholder="my-app" style="width: 100%;">
-                </div>
-                <div>
-                    <label style="color: #888; font-size: 0.85rem;">Name</label>
-                    <input type="text" id="preview-name-input" placeholder="My app" style="width: 100%;">
-                </div>
-                <button onclick="registerPreview()">Register</button>
-            </div>
-            <div id="preview-result" class="result"></div>
-            <div style="margin-top: 0.75rem;">
-                <button onclick="fetchPreviews()" class="secondary">Refresh</button>
-            </div>
-            <div id="preview-list" style="margin-top: 0.75rem;"></div>
-        </div>
-
-        </div><!-- /page-ports -->
-
-        <!-- ==================== SNAPSHOTS PAGE ==================== -->
-        <div id="page-snapshots" class="page">
-        <h1>Snapshots</h1>
-
-        <h2>Snapshots</h2>
-        <div class="card">
-            <div style="display: flex; align-items: center; gap: 0.5rem; flex-wrap: wrap;">
-                <input type="text" id="snapshot-name-input" placeholder="Name (optional)" style="width: 200px; padding: 0.3rem 0.5rem; background: #222; color: #eee; border: 1px solid #444; border-radius: 3px;">
-                <button onclick="createSnapshot()">Create Snapshot</button>
-                <button onclick="syncSnapshots()" class="secondary">Sync to Host</button>
-                <button onclick="fetchSnapshots()" class="secondary">Refresh List</button>
-                <button onclick="deleteAllSnapshots()" class="danger">Delete All</button>
-            </div>
-            <div id="snapshot-result" class="result"></div>
-            <div id="snapshot-list" style="margin-top: 0.5rem;"></div>
-            <div style="margin-top: 1rem; padding-top: 1rem; border-top: 1px solid #333;">
-                <label style="color: #888;">Restore from snapshot:</label>
-                <select id="snapshot-select" style="margin: 0.5rem 0; padding: 0.3rem; background: #222; color: #eee; border: 1px solid #444;">
-                    <option value="latest">latest</option>
-                </select>
-                <button onclick="restoreSnapshot()" class="danger">Restore</button>
-                <div id="restore-result" class="result" style="margin-top: 0.5rem;"></div>
-            </div>
-        </div>
-
-        <h2>Security Audit</h2>
-        <div class="card">
-            <button onclick="runSecurityAudit()" class="secondary">Security Audit</button>
-            <button onclick="runSecurityAudit(true)" class="secondary">Deep Audit</button>
-            <div id="security-result" class="result"></div>
-        </div>
-
-        </div><!-- /page-snapshots -->
-
-        <!-- ==================== SNAPSHOT BROWSER OVERLAY ==================== -->
-        <div id="snapshot-browser-overlay" style="display:none; position:fixed; top:0; left:0; right:0; bottom:0; background:#1a1a1a; z-index:1000; flex-direction:column;">
-            <!-- Top bar -->
-            <div style="display:flex; align-items:center; gap:0.75rem; padding:0.5rem 1rem; background:#151515; border-bottom:1px solid #333; flex-shrink:0;">
-                <span style="color:#4CAF50; font-weight:bold; font-size:1.1rem;">Browse</span>
-                <span id="sb-snapshot-name" style="color:#888; font-size:0.9rem;"></span>
-                <div style="flex:1;"></div>
-                <input type="text" id="sb-save-name" placeholder="New snapshot name" style="width:200px; padding:0.3rem 0.5rem; background:#222; color:#eee; border:1px solid #444; border-radius:3px; font-family:monospace;">
-                <button onclick="saveWorkspaceAsSnapshot()" class="secondary" style="padding:0.3rem 0.75rem; font-size:0.85rem;">Save as New Snapshot</button>
-                <button onclick="closeSnapshotBrowser()" style="background:#c62828; padding:0.3rem 0.75rem; font-size:0.85rem;">Close</button>
-            </div>
-            <!-- Main content -->
-            <div style="display:flex; flex:1; overflow:hidden;">
-                <!-- Left panel: file tree -->
-                <div style="width:280px; min-width:280px; background:#1e1e1e; border-right:1px solid #333; display:flex; flex-direction:column; overflow:hidden;">
-                    <div style="padding:0.4rem 0.75rem; border-bottom:1px solid #333; display:flex; align-items:center; gap:0.5rem;">
-                        <span style="color:#888; font-size:0.8rem; flex:1;">FILES</span>
-                        <button onclick="refreshFileTree()" style="background:none; color:#888; border:none; padding:0.1rem 0.3rem; font-size:0.75rem; cursor:pointer;" title="Refresh">&#x21bb;</button>
-                    </div>
-                    <div id="sb-file-tree" style="flex:1; overflow-y:auto; padding:0.25rem 0; font-size:0.8rem;"></div>
-                    <div id="sb-drop-zone" style="padding:0.75rem; border-top:1px solid #333; text-align:center; color:#666; font-size:0.8rem; cursor:pointer; min-height:50px; display:flex; align-items:center; justify-content:center;"
-                         ondragover="handleDragOver(event)" ondrop="handleFileDrop(event)" ondragleave="this.style.borderColor='#333'; this.style.background='transparent';">
-                        Drop files here to upload
-                    </div>
-                </div>
-                <!-- Right panel: editor -->
-                <div style="flex:1; display:flex; flex-direction:column; overflow:hidden;">
-                    <!-- Editor toolbar -->
-                    <div id="sb-editor-toolbar" style="display:none; padding:0.3rem 0.75rem; background:#252525; border-bottom:1px solid #333; align-items:center; gap:0.5rem;">
-                        <span id="sb-current-file" style="color:#4CAF50; font-size:0.85rem; flex:1; overflow:hidden; text-overflow:ellipsis; white-space:nowrap;"></span>
-                        <button onclick="saveCurrentFile()" id="sb-save-btn" style="padding:0.2rem 0.6rem; font-size:0.8rem;">Save File</button>
-                        <button onclick="downloadCurrentFile()" class="secondary" style="padding:0.2rem 0.6rem; font-size:0.8rem;">Download</button>
-                    </div>
-                    <!-- Editor area -->
-                    <div id="sb-editor-area" style="flex:1; overflow:hidden; display:flex; align-items:center; justify-content:center;">
-                        <div id="sb-welcome" style="color:#555; text-align:center;">
-                            <div style="font-size:1.5rem; margin-bottom:0.5rem;">&#128193;</div>
-                            <div>Select a file from the tree to view or edit</div>
-                        </div>
-                        <div id="sb-binary-msg" style="display:none; color:#888; text-align:center;">
-                            <div style="font-size:1.5rem; margin-bottom:0.5rem;">&#128230;</div>
-                            <div>Binary file — cannot edit</div>
-                            <button onclick="downloadCurrentFile()" class="secondary" style="margin-top:0.75rem;">Download</button>
-                        </div>
-                        <div id="sb-codemirror-wrap" style="display:none; width:100%; height:100%;"></div>
-                    </div>
-                </div>
-            </div>
-        </div>
-
-        <!-- ==================== SETTINGS PAGE ==================== -->
-        <div id="page-settings" class="page">
-        <h1>Settings</h1>
-
-        <h2>Instance Info</h2>
-        <div class="card">
-            <div style="display: flex; flex-direction: column; gap: 0.5rem;">
-                <div><span style="color: #888;">Instance:</span> <span style="color: #4CAF50;">{INSTANCE_NAME}</span></div>
-                <div><span style="color: #888;">Gateway Port:</span> <span>{GATEWAY_PORT}</span></div>
-                <div><span style="color: #888;">Mode:</span> <span style="color: #2196F3;">{"Lima" if IS_LIMA_MODE else "Docker"}</span></div>
-            </div>
-        </div>
-
-        </div><!-- /page-settings -->
-
-        </main><!-- /content -->
-
-        <style>
-            .channel-card {{
-                background: #2d2d2d;
-                padding: 1rem;
-                border-radius: 4px;
-                border: 1px solid #444;
-            }}
-            .channel-card:hover {{
-                border-color: #555;
-            }}
-            .channel-status.connected {{ color: #4CAF50; }}
-            .channel-status.pending {{ color: #ff9800; }}
-            .channel-status.error {{ color: #ef9a9a; }}
-
-            .status-dot {{
-                display: inline-block;
-                width: 8px;
-                height: 8px;
-                border-radius: 50%;
-                margin-right: 6px;
-                background: #666;
-                animation: pulse 2s infinite;
-            }}
-            .status-dot.online {{
-                background: #4CAF50;
-                box-shadow: 0 0 6px #4CAF50;
-            }}
-            .status-dot.offline {{
-                background: #ef9a9a;
-                box-shadow: 0 0 6px #ef9a9a;
-                animation: none;
-            }}
-            @keyframes pulse {{
-                0%, 100% {{ opacity: 1; }}
-                50% {{ opacity: 0.5; }}
-            }}
-        </style>
-
-        <script>
-            // Detect base path from current URL (handles /controller via Tailscale)
-            const basePath = window.location.pathname.includes('/controller') ? '/controller' : '';
-
-            // ---- HTML escaping (XSS prevention) ----
-            function escHtml(str) {{
-                if (str === null || str === undefined) return '';
-                return String(str).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;').replace(/'/g, '&#039;');
-            }}
-
-            // ---- Sidebar navigation ----
-            let configEditor;
-            function switchPage(name) {{
-                document.querySelectorAll('.page').forEach(p => p.classList.remove('active'));
-                document.querySelectorAll('#sidebar a').forEach(a => a.classList.remove('active'));
-                const page = document.getElementById('page-' + name);
-                if (page) page.classList.add('active');
-                const link = document.querySelector('#sidebar a[href="#' + name + '"]');
-                if (link) link.classList.add('active');
-                window.location.hash = name;
-
-                // Refresh CodeMirror when gateway tab activates (sizing fix)
-                if (name === 'gateway' && typeof configEditor !== 'undefined' && configEditor) {{
-                    setTimeout(() => configEditor.refresh(), 50);
-                }}
-                // Auto-load data when switching to logs
-                if (name === 'logs') {{
-                    const activeSubTab = document.querySelector('.sub-tab.active');
-                    if (activeSubTab && activeSubTab.textContent === 'Traffic') fetchTraffic();
-                }}
-                // Auto-load preview ports when switching to ports
-                if (name === 'ports') {{
-                    fetchPreviews();
-                }}
-                // Auto-load snapshots when switching to snapshots
-                if (name === 'snapshots') {{
-                    fetchSnapshots();
-                }}
-            }}
-
-            // Hash-based routing
-            function handleHash() {{
-                const hash = window.location.hash.replace('#', '') || 'dashboard';
-                switchPage(hash);
-            }}
-            window.addEventListener('hashchange', handleHash);
-            // Set initial page from hash
-            if (window.location.hash) handleHash();
-
-            // Sub-tab switching (Logs page)
-            function switchSubTab(name) {{
-                document.querySelectorAll('.sub-content').forEach(c => c.classList.remove('active'));
-                document.querySelectorAll('.sub-tab').forEach(t => t.classList.remove('active'));
-                const content = document.getElementById('sub-' + name);
-                if (content) content.classList.add('active');
-                event.target.classList.add('active');
-            }}
-
-            // ---- Traffic functions ----
-            let trafficPage = 0;
-
-            async function loadTrafficProviders() {{
-                try {{
-                    const resp = await fetch(basePath + '/traffic/providers');
-                    const data = await resp.json();
-                    const select = document.getElementById('traffic-provider-filter');
-                    if (select && data.providers) {{
-                        data.providers.forEach(p => {{
-                            const opt = document.createElement('option');
-                            opt.value = p;
-                            opt.textContent = p;
-                            select.appendChild(opt);
-                        }});
-                    }}
-                }} catch(e) {{ /* ignore */ }}
-            }}
-            loadTrafficProviders();
-
-            async function fetchTraffic(page = 0) {{
-                trafficPage = page;
-                const container = document.getElementById('traffic-table-container');
-                const provider = document.getElementById('traffic-provider-filter').value;
-                const search = document.getElementById('traffic-search').value;
-                container.innerHTML = '<p style="color: #888;">Loading traffic...</p>';
-                try {{
-                    let url = basePath + '/traffic?limit=50&offset=' + (page * 50);
-                    if (provider) url += '&provider=' + provider;
-                    if (search) url += '&search=' + encodeURIComponent(search);
-                    const resp = await fetch(url);
-                    const data = await resp.json();
-                    renderTrafficTable(data.entries || []);
-                }} catch(e) {{
-                    container.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            let lastTrafficDecrypted = false;
-
-            function renderTrafficTable(entries, isDecrypted = false) {{
-                lastTrafficDecrypted = isDecrypted;
-                const container = document.getElementById('traffic-table-container');
-                if (!entries || entries.length === 0) {{
-                    container.innerHTML = '<p style="color: #888;">No traffic entries found.</p>';
-                    return;
-                }}
-                let html = '';
-                if (isDecrypted) {{
-                    html += '<div style="margin-bottom: 0.5rem; font-size: 0.75rem; color: #1565C0; background: #0d2137; padding: 0.3rem 0.6rem; border-radius: 4px; display: inline-block;">Showing decrypted MITM traffic (not written to disk)</div>';
-                }}
-                html += '<table class="traffic-table"><thead><tr>';
-                html += '<th>Time</th><th>Provider</th><th>Method</th><th>Path</th><th>Status</th><th>Duration</th><th>Tokens</th><th></th>';
-                html += '</tr></thead><tbody>';
-                entries.forEach(e => {{
-                    const ts = e.timestamp ? escHtml(e.timestamp.slice(11, 19)) : '--';
-                    const provClass = 'provider-' + escHtml(e.provider || 'unknown');
-                    const statusColor = (e.response_status >= 400) ? '#ef9a9a' : '#a5d6a7';
-                    const tokens = (e.tokens_in || 0) + (e.tokens_out || 0);
-                    const tokenStr = tokens > 0 ? tokens.toLocaleString() : '--';
-                    const duration = e.duration_ms ? Math.round(e.duration_ms) + 'ms' : '--';
-                    const streamBadge = e.streaming ? ' <span style="color: #888; font-size: 0.7rem;">SSE</span>' : '';
-                    const llmBadge = e.is_llm ? ' <span style="color: #ff9800; font-size: 0.7rem;">LLM</span>' : '';
-                    const safeId = escHtml(e.id);
-                    const detailFn = isDecrypted ? 'viewDecryptedDetail' : 'viewTrafficDetail';
-                    html += `<tr style="cursor: pointer;" onclick="${{detailFn}}('${{safeId}}')">`;
-                    html += `<td style="color: #888;">${{ts}}</td>`;
-                    html += `<td class="provider ${{provClass}}">${{escHtml(e.provider || '?')}}</td>`;
-                    html += `<td>${{escHtml(e.method || '?')}}</td>`;
-                    html += `<td style="max-width: 250px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap;">${{escHtml(e.path || e.url || '?')}}${{streamBadge}}${{llmBadge}}</td>`;
-                    html += `<td style="color: ${{statusColor}};">${{escHtml(e.response_status || '?')}}</td>`;
-                    html += `<td>${{duration}}</td>`;
-                    html += `<td>${{tokenStr}}</td>`;
-                    html += `<td><button class="small secondary" onclick="event.stopPropagation(); ${{detailFn}}('${{safeId}}')">Detail</button></td>`;
-                    html += '</tr>';
-                }});
-                html += '</tbody></table>';
-
-                // Pagination
-                const pageFn = isDecrypted ? 'decryptTraffic' : 'fetchTraffic';
-                html += '<div style="margin-top: 0.5rem; display: flex; gap: 0.5rem;">';
-                if (trafficPage > 0) html += `<button class="small secondary" onclick="${{pageFn}}(${{trafficPage - 1}})">Previous</button>`;
-                if (entries.length === 50) html += `<button class="small secondary" onclick="${{pageFn}}(${{trafficPage + 1}})">Next</button>`;
-                html += '</div>';
-
-                container.innerHTML = html;
-            }}
-
-            async function viewTrafficDetail(id) {{
-                // Switch to LLM Sessions sub-tab and show detail
-                const detail = document.getElementById('llm-session-detail');
-                detail.innerHTML = '<p style="color: #888;">Loading details...</p>';
-
-                // Switch to LLM Sessions tab
-                document.querySelectorAll('.sub-content').forEach(c => c.classList.remove('active'));
-                document.querySelectorAll('.sub-tab').forEach(t => t.classList.remove('active'));
-                document.getElementById('sub-llm-sessions').classList.add('active');
-                document.querySelectorAll('.sub-tab').forEach(t => {{
-                    if (t.textContent === 'LLM Sessions') t.classList.add('active');
-                }});
-
-                try {{
-                    const resp = await fetch(basePath + '/traffic/' + id);
-                    const data = await resp.json();
-
-                    let html = '<div class="traffic-detail">';
-                    html += `<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">`;
-                    html += `<h3 style="margin: 0; color: #4CAF50;">Request Detail</h3>`;
-                    html += `<button class="small secondary" onclick="document.querySelectorAll('.sub-content').forEach(c=>c.classList.remove('active'));document.getElementById('sub-traffic').classList.add('active');document.querySelectorAll('.sub-tab').forEach(t=>{{t.classList.remove('active');if(t.textContent==='Traffic')t.classList.add('active');}});">Back to Traffic</button>`;
-                    html += `</div>`;
-
-                    html += `<div class="stats">`;
-                    html += `<div class="stat"><div class="stat-value provider-${{escHtml(data.provider || '')}}">${{escHtml(data.provider || '?')}}</div><div class="stat-label">Provider</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{escHtml(data.response_status || '?')}}</div><div class="stat-label">Status</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{Math.round(data.duration_ms || 0)}}ms</div><div class="stat-label">Duration</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{(data.tokens_in || 0).toLocaleString()}}</div><div class="stat-label">Tokens In</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{(data.tokens_out || 0).toLocaleString()}}</div><div class="stat-label">Tokens Out</div></div>`;
-                    html += `</div>`;
-
-                    html += `<p style="color: #888; font-size: 0.85rem;"><strong>ID:</strong> ${{escHtml(data.id)}} | <strong>Time:</strong> ${{escHtml(data.timestamp)}} | <strong>Method:</strong> ${{escHtml(data.method)}} <strong>Path:</strong> ${{escHtml(data.path)}}${{data.streaming ? ' | <span style="color: #ff9800;">Streaming</span>' : ''}}</p>`;
-
-                    html += `<details style="margin-top: 1rem;"><summary style="cursor: pointer; color: #2196F3;">Request Headers</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.request_headers || {{}}, null, 2))}}</pre></details>`;
-
-                    html += `<details open style="margin-top: 0.5rem;"><summary style="cursor: pointer; color: #4CAF50;">Request Body</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.request_body || null, null, 2))}}</pre></details>`;
-
-                    html += `<details open style="margin-top: 0.5rem;"><summary style="cursor: pointer; color: #ff9800;">Response Body</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.response_body || null, null, 2))}}</pre></details>`;
-
-                    if (data.error) {{
-                        html += `<div style="margin-top: 0.5rem; padding: 0.5rem; background: #3d2020; border: 1px solid #ef9a9a; border-radius: 4px;"><strong style="color: #ef9a9a;">Error:</strong> ${{escHtml(data.error)}}</div>`;
-                    }}
-
-                    html += '</div>';
-                    detail.innerHTML = html;
-                }} catch(e) {{
-                    detail.innerHTML = '<p style="color: #ef9a9a;">Error loading detail: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            async function viewDecryptedDetail(id) {{
-                // Same as viewTrafficDetail but uses decrypt endpoint
-                const detail = document.getElementById('llm-session-detail');
-                detail.innerHTML = '<p style="color: #888;">Decrypting entry...</p>';
-
-                document.querySelectorAll('.sub-content').forEach(c => c.classList.remove('active'));
-                document.querySelectorAll('.sub-tab').forEach(t => t.classList.remove('active'));
-                document.getElementById('sub-llm-sessions').classList.add('active');
-                document.querySelectorAll('.sub-tab').forEach(t => {{
-                    if (t.textContent === 'LLM Sessions') t.classList.add('active');
-                }});
-
-                try {{
-                    const resp = await fetch(basePath + '/traffic/decrypt/' + id);
-                    const data = await resp.json();
-
-                    let html = '<div class="traffic-detail">';
-                    html += `<div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">`;
-                    html += `<h3 style="margin: 0; color: #1565C0;">Decrypted Request Detail</h3>`;
-                    html += `<button class="small secondary" onclick="document.querySelectorAll('.sub-content').forEach(c=>c.classList.remove('active'));document.getElementById('sub-traffic').classList.add('active');document.querySelectorAll('.sub-tab').forEach(t=>{{t.classList.remove('active');if(t.textContent==='Traffic')t.classList.add('active');}});">Back to Traffic</button>`;
-                    html += `</div>`;
-                    html += `<div style="margin-bottom: 0.5rem; font-size: 0.75rem; color: #1565C0; background: #0d2137; padding: 0.3rem 0.6rem; border-radius: 4px; display: inline-block;">Decrypted in memory only</div>`;
-
-                    html += `<div class="stats">`;
-                    html += `<div class="stat"><div class="stat-value provider-${{escHtml(data.provider || '')}}">${{escHtml(data.provider || '?')}}</div><div class="stat-label">Provider</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{escHtml(data.response_status || '?')}}</div><div class="stat-label">Status</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{Math.round(data.duration_ms || 0)}}ms</div><div class="stat-label">Duration</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{(data.tokens_in || 0).toLocaleString()}}</div><div class="stat-label">Tokens In</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{(data.tokens_out || 0).toLocaleString()}}</div><div class="stat-label">Tokens Out</div></div>`;
-                    html += `</div>`;
-
-                    html += `<p style="color: #888; font-size: 0.85rem;"><strong>ID:</strong> ${{escHtml(data.id)}} | <strong>Time:</strong> ${{escHtml(data.timestamp)}} | <strong>Host:</strong> ${{escHtml(data.host || '?')}} | <strong>Method:</strong> ${{escHtml(data.method)}} <strong>URL:</strong> ${{escHtml(data.url || data.path)}}${{data.streaming ? ' | <span style="color: #ff9800;">Streaming</span>' : ''}}${{data.is_llm ? ' | <span style="color: #ff9800;">LLM</span>' : ''}}</p>`;
-
-                    html += `<details style="margin-top: 1rem;"><summary style="cursor: pointer; color: #2196F3;">Request Headers</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.request_headers || {{}}, null, 2))}}</pre></details>`;
-
-                    html += `<details open style="margin-top: 0.5rem;"><summary style="cursor: pointer; color: #4CAF50;">Request Body</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.request_body || null, null, 2))}}</pre></details>`;
-
-                    html += `<details style="margin-top: 0.5rem;"><summary style="cursor: pointer; color: #2196F3;">Response Headers</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.response_headers || {{}}, null, 2))}}</pre></details>`;
-
-                    html += `<details open style="margin-top: 0.5rem;"><summary style="cursor: pointer; color: #ff9800;">Response Body</summary>`;
-                    html += `<pre style="margin-top: 0.5rem;">${{escHtml(JSON.stringify(data.response_body || null, null, 2))}}</pre></details>`;
-
-                    html += '</div>';
-                    detail.innerHTML = html;
-                }} catch(e) {{
-                    detail.innerHTML = '<p style="color: #ef9a9a;">Error decrypting entry: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            async function fetchTrafficStats() {{
-                const container = document.getElementById('traffic-stats');
-                container.style.display = 'block';
-                container.innerHTML = '<p style="color: #888;">Loading stats...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/traffic/stats');
-                    const s = await resp.json();
-                    let html = '<div class="card"><div class="stats">';
-                    html += `<div class="stat"><div class="stat-value">${{s.total_requests}}</div><div class="stat-label">Total Requests</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{Math.round(s.avg_duration_ms)}}ms</div><div class="stat-label">Avg Duration</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{(s.total_tokens_in + s.total_tokens_out).toLocaleString()}}</div><div class="stat-label">Total Tokens</div></div>`;
-                    html += `<div class="stat"><div class="stat-value">${{s.error_rate}}%</div><div class="stat-label">Error Rate</div></div>`;
-                    html += '</div>';
-                    if (Object.keys(s.by_provider).length > 0) {{
-                        html += '<div style="margin-top: 0.5rem; font-size: 0.85rem;">';
-                        Object.entries(s.by_provider).forEach(([prov, count]) => {{
-                            html += `<span class="provider provider-${{escHtml(prov)}}" style="margin-right: 1rem;">${{escHtml(prov)}}: ${{count}}</span>`;
-                        }});
-                        html += '</div>';
-                    }}
-                    html += '</div>';
-                    container.innerHTML = html;
-                }} catch(e) {{
-                    container.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            // ---- MITM Capture toggle ----
-            let captureEnabled = null;
-            let captureEntryCount = 0;
-
-            async function fetchCaptureStatus() {{
-                try {{
-                    const resp = await fetch(basePath + '/capture');
-                    const data = await resp.json();
-                    captureEnabled = data.enabled;
-                    captureEntryCount = data.entry_count || 0;
-                    updateCaptureUI();
-                }} catch(e) {{
-                    document.getElementById('capture-status-text').textContent = 'MITM Capture: error';
-                }}
-            }}
-
-            function updateCaptureUI() {{
-                const dot = document.getElementById('capture-status-dot');
-                const text = document.getElementById('capture-status-text');
-                const btn = document.getElementById('capture-toggle-btn');
-                const countEl = document.getElementById('capture-entry-count');
-                if (captureEnabled) {{
-                    dot.style.background = '#4CAF50';
-                    dot.style.boxShadow = '0 0 6px #4CAF50';
-                    text.textContent = 'MITM Capture: ON';
-                    text.style.color = '#4CAF50';
-                    btn.textContent = 'Disable';
-                    btn.className = 'small danger';
-                }} else {{
-                    dot.style.background = '#888';
-                    dot.style.boxShadow = 'none';
-                    text.textContent = 'MITM Capture: OFF';
-                    text.style.color = '#888';
-                    btn.textContent = 'Enable';
-                    btn.className = 'small';
-                }}
-                if (countEl) {{
-                    countEl.textContent = captureEntryCount > 0 ? `(${{captureEntryCount}} entries)` : '';
-                }}
-            }}
-
-            async function toggleCapture() {{
-                const newState = !captureEnabled;
-                const action = newState ? 'enable' : 'disable';
-                const msg = newState
-                    ? 'Enable MITM capture?\\n\\nThis will:\\n- Start mitmproxy transparent proxy\\n- Redirect all gateway HTTPS traffic through it\\n- Log encrypted traffic entries'
-                    : 'Disable MITM capture?\\n\\nThis will:\\n- Remove traffic redirect rules\\n- Stop mitmproxy';
-                if (!confirm(msg)) return;
-                try {{
-                    btn = document.getElementById('capture-toggle-btn');
-                    btn.textContent = '...';
-                    btn.disabled = true;
-                    const resp = await fetch(basePath + '/capture', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ enabled: newState }})
-                    }});
-                    const data = await resp.json();
-                    captureEnabled = data.enabled;
-                    updateCaptureUI();
-                    btn.disabled = false;
-                }} catch(e) {{
-                    alert('Error toggling capture: ' + e.message);
-                    document.getElementById('capture-toggle-btn').disabled = false;
-                }}
-            }}
-
-            // ---- Decrypt & View (MITM encrypted traffic) ----
-            async function decryptTraffic(page = 0) {{
-                trafficPage = page;
-                const container = document.getElementById('traffic-table-container');
-                const provider = document.getElementById('traffic-provider-filter').value;
-                const search = document.getElementById('traffic-search').value;
-                container.innerHTML = '<p style="color: #888;">Decrypting traffic...</p>';
-                try {{
-                    let url = basePath + '/traffic/decrypt?limit=50&offset=' + (page * 50);
-                    if (provider) url += '&provider=' + provider;
-                    if (search) url += '&search=' + encodeURIComponent(search);
-                    const resp = await fetch(url);
-                    if (!resp.ok) {{
-                        const err = await resp.json();
-                        container.innerHTML = '<p style="color: #ef9a9a;">' + escHtml(err.detail || 'Decryption failed') + '</p>';
-                        return;
-                    }}
-                    const data = await resp.json();
-                    renderTrafficTable(data.entries || [], true);
-                }} catch(e) {{
-                    container.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            // ---- Delete encrypted traffic logs ----
-            async function deleteTrafficLogs() {{
-                const deleteKey = confirm('Also delete the encryption key?\\n\\nOK = Delete logs + key (old logs become unreadable)\\nCancel = Delete logs only (key preserved for new captures)');
-                if (!confirm('Delete all captured traffic logs?\\n\\nThis cannot be undone.')) return;
-                try {{
-                    const resp = await fetch(basePath + '/traffic/delete', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ delete_key: deleteKey }})
-                    }});
-                    const data = await resp.json();
-                    let msg = 'Logs deleted.';
-                    if (data.deleted_key) msg += ' Encryption key also deleted.';
-                    alert(msg);
-                    document.getElementById('traffic-table-container').innerHTML = '<p style="color: #888;">Logs deleted.</p>';
-                    fetchCaptureStatus();
-                }} catch(e) {{
-                    alert('Error deleting logs: ' + e.message);
-                }}
-            }}
-
-            // Load capture status on page load
-            fetchCaptureStatus();
-
-            // ---- Scrub Rules functions ----
-            let currentScrubRules = [];
-
-            async function fetchScrubRules() {{
-                const list = document.getElementById('scrub-rules-list');
-                list.innerHTML = '<p style="color: #888;">Loading rules...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/scrub-rules');
-                    const data = await resp.json();
-                    currentScrubRules = data.rules || [];
-                    renderScrubRules();
-                }} catch(e) {{
-                    list.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            function renderScrubRules() {{
-                const list = document.getElementById('scrub-rules-list');
-                if (!currentScrubRules || currentScrubRules.length === 0) {{
-                    list.innerHTML = '<p style="color: #888;">No rules configured.</p>';
-                    return;
-                }}
-                let html = '';
-                currentScrubRules.forEach((r, idx) => {{
-                    const builtinClass = r.builtin ? ' builtin' : '';
-                    const enabledColor = r.enabled ? '#4CAF50' : '#888';
-                    html += `<div class="scrub-rule${{builtinClass}}">`;
-                    html += `<div style="display: flex; justify-content: space-between; align-items: center;">`;
-                    html += `<div><strong style="color: ${{enabledColor}};">${{escHtml(r.name || r.id)}}</strong>`;
-                    if (r.builtin) html += ` <span style="color: #2196F3; font-size: 0.75rem;">built-in</span>`;
-                    html += `<br><code style="font-size: 0.75rem; color: #888;">${{escHtml(r.pattern)}}</code></div>`;
-                    html += `<div style="display: flex; gap: 0.3rem;">`;
-                    html += `<button class="small ${{r.enabled ? 'danger' : ''}}" onclick="toggleScrubRule(${{idx}})">${{r.enabled ? 'Disable' : 'Enable'}}</button>`;
-                    if (!r.builtin) html += `<button class="small danger" onclick="removeScrubRule(${{idx}})">Remove</button>`;
-                    html += `</div></div></div>`;
-                }});
-                list.innerHTML = html;
-            }}
-
-            function toggleScrubRule(idx) {{
-                if (currentScrubRules[idx]) {{
-                    currentScrubRules[idx].enabled = !currentScrubRules[idx].enabled;
-                    renderScrubRules();
-                }}
-            }}
-
-            function removeScrubRule(idx) {{
-                if (currentScrubRules[idx] && !currentScrubRules[idx].builtin) {{
-                    currentScrubRules.splice(idx, 1);
-                    renderScrubRules();
-                }}
-            }}
-
-            function addScrubRule() {{
-                const name = document.getElementById('scrub-rule-name').value.trim();
-                const id = document.getElementById('scrub-rule-id').value.trim();
-                const pattern = document.getElementById('scrub-rule-pattern').value.trim();
-                const replacement = document.getElementById('scrub-rule-replacement').value || '***REDACTED***';
-                if (!name || !id || !pattern) {{
-                    alert('Name, ID, and Pattern are required.');
-                    return;
-                }}
-                currentScrubRules.push({{ id, name, pattern, replacement, enabled: true, builtin: false }});
-                renderScrubRules();
-                document.getElementById('scrub-rule-name').value = '';
-                document.getElementById('scrub-rule-id').value = '';
-                document.getElementById('scrub-rule-pattern').value = '';
-            }}
-
-            async function saveScrubRules() {{
-                try {{
-                    const resp = await fetch(basePath + '/scrub-rules', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ rules: currentScrubRules }})
-                    }});
-                    const data = await resp.json();
-                    alert('Scrub rules saved (' + data.rule_count + ' rules).');
-                }} catch(e) {{
-                    alert('Error saving rules: ' + e.message);
-                }}
-            }}
-
-            async function testScrubRuleUI() {{
-                const pattern = document.getElementById('scrub-rule-pattern').value.trim();
-                const replacement = document.getElementById('scrub-rule-replacement').value || '***REDACTED***';
-                const sample = document.getElementById('scrub-test-sample').value;
-                const result = document.getElementById('scrub-test-result');
-
-                if (!pattern || !sample) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.textContent = 'Enter both a pattern and sample text.';
-                    return;
-                }}
-
-                try {{
-                    const resp = await fetch(basePath + '/scrub-rules/test', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ pattern, replacement, sample }})
-                    }});
-                    const data = await resp.json();
-                    result.style.display = 'block';
-                    if (data.valid) {{
-                        result.className = 'result';
-                        result.innerHTML = `<strong>Matches:</strong> ${{data.matches}}<br><strong>Result:</strong> <code>${{escHtml(data.result)}}</code>`;
-                    }} else {{
-                        result.className = 'result error';
-                        result.textContent = 'Invalid regex: ' + data.error;
-                    }}
-                }} catch(e) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Initialize CodeMirror editor
-            document.addEventListener('DOMContentLoaded', function() {{
-                configEditor = CodeMirror(document.getElementById('config-editor-wrapper'), {{
-                    mode: {{ name: 'javascript', json: true }},
-                    theme: 'material-darker',
-                    lineNumbers: true,
-                    matchBrackets: true,
-                    autoCloseBrackets: true,
-                    foldGutter: true,
-                    gutters: ['CodeMirror-linenumbers', 'CodeMirror-foldgutter'],
-                    tabSize: 2,
-                    indentWithTabs: false,
-                    lineWrapping: false,
-                    placeholder: 'Click "Load Config" to view...'
-                }});
-
-                // Update cursor position display
-                configEditor.on('cursorActivity', function() {{
-                    const cursor = configEditor.getCursor();
-                    document.getElementById('cursor-pos').textContent = `Line ${{cursor.line + 1}}, Col ${{cursor.ch + 1}}`;
-                }});
-
-                // Live JSON validation
-                configEditor.on('change', function() {{
-                    const jsonStatus = document.getElementById('json-status');
-                    const value = configEditor.getValue();
-                    if (!value.trim()) {{
-                        jsonStatus.textContent = '';
-                        return;
-                    }}
-                    try {{
-                        JSON.parse(value);
-                        jsonStatus.innerHTML = '<span style="color: #4CAF50;">✓ Valid JSON</span>';
-                    }} catch(e) {{
-                        const match = e.message.match(/position\s+(\d+)/i);
-                        if (match) {{
-                            const pos = parseInt(match[1]);
-                            const cmPos = configEditor.posFromIndex(pos);
-                            jsonStatus.innerHTML = `<span style="color: #ef9a9a;">✗ Error at line ${{cmPos.line + 1}}</span>`;
-                        }} else {{
-                            jsonStatus.innerHTML = '<span style="color: #ef9a9a;">✗ Invalid JSON</span>';
-                        }}
-                    }}
-                }});
-            }});
-
-            // Helper to get/set editor value
-            function getEditorValue() {{
-                return configEditor ? configEditor.getValue() : '';
-            }}
-            function setEditorValue(value) {{
-                if (configEditor) configEditor.setValue(value);
-            }}
-
-            async function fetchHealth() {{
-                const statusIndicator = document.getElementById('gateway-status-indicator');
-                const lastUpdate = document.getElementById('gateway-last-update');
-                try {{
-                    const resp = await fetch(basePath + '/health');
-                    const data = await resp.json();
-                    const now = new Date().toLocaleTimeString();
-                    if (statusIndicator) {{
-                        statusIndicator.className = data.status === 'healthy' ? 'status-dot online' : 'status-dot offline';
-                    }}
-                    if (lastUpdate) {{
-                        lastUpdate.textContent = '(' + now + ')';
-                    }}
-                }} catch(e) {{
-                    if (statusIndicator) {{
-                        statusIndicator.className = 'status-dot offline';
-                    }}
-                }}
-            }}
-
-            async function fetchAudit(limit = 20) {{
-                try {{
-                    const resp = await fetch(basePath + '/audit?limit=' + limit);
-                    const data = await resp.json();
-                    const log = document.getElementById('audit-log');
-                    if (data.entries && data.entries.length > 0) {{
-                        log.textContent = data.entries.map(e =>
-                            `[${{e.timestamp.slice(0,19)}}] ${{e.event}}`
-                        ).reverse().join('\\n');
-                    }} else {{
-                        log.textContent = 'No audit entries yet.';
-                    }}
-                }} catch(e) {{
-                    document.getElementById('audit-log').textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Gateway logs
-            let logsAutoRefreshInterval = null;
-
-            async function fetchGatewayLogs(lines = 100) {{
-                const log = document.getElementById('gateway-logs');
-                try {{
-                    const resp = await fetch(basePath + '/gateway/logs?lines=' + lines);
-                    const data = await resp.json();
-                    if (data.error) {{
-                        log.textContent = 'Error: ' + data.error;
-                    }} else if (data.logs) {{
-                        log.textContent = data.logs;
-                        // Auto-scroll to bottom
-                        log.scrollTop = log.scrollHeight;
-                    }} else {{
-                        log.textContent = 'No logs available.';
-                    }}
-                }} catch(e) {{
-                    log.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            function toggleLogsAutoRefresh() {{
-                const checkbox = document.getElementById('logs-auto-refresh');
-                if (checkbox.checked) {{
-                    fetchGatewayLogs();
-                    logsAutoRefreshInterval = setInterval(() => fetchGatewayLogs(), 3000);
-                }} else {{
-                    if (logsAutoRefreshInterval) {{
-                        clearInterval(logsAutoRefreshInterval);
-                        logsAutoRefreshInterval = null;
-                    }}
-                }}
-            }}
-
-            // Preview passthrough ports
-            async function fetchPreviews() {{
-                const list = document.getElementById('preview-list');
-                if (!list) return;
-                list.innerHTML = '<p style="color: #888;">Loading...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/previews');
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        list.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(data.error || data.detail || 'Unable to load previews') + '</p>';
-                        return;
-                    }}
-                    renderPreviews(data.previews || []);
-                }} catch(e) {{
-                    list.innerHTML = '<p style="color: #ef9a9a;">Error: ' + escHtml(e.message) + '</p>';
-                }}
-            }}
-
-            function renderPreviews(previews) {{
-                const list = document.getElementById('preview-list');
-                if (!previews.length) {{
-                    list.innerHTML = '<p style="color: #888; font-size: 0.85rem;">No preview ports registered.</p>';
-                    return;
-                }}
-                let html = '<div style="max-height: 360px; overflow-y: auto;">';
-                previews.forEach(p => {{
-                    const ref = p.alias || p.id;
-                    const url = p.path || ('/previews/' + ref + '/');
-                    const openUrl = window.location.origin + url;
-                    const owner = p.agent && p.agent !== 'operator' ? ('agent: ' + p.agent) : (p.owner || 'operator');
-                    html += `<div style="padding: 0.55rem 0; border-bottom: 1px solid #333; display: flex; justify-content: space-between; gap: 0.75rem; align-items: center;">
-                        <div style="min-width: 0;">
-                            <div><strong>${{escHtml(p.name || ref)}}</strong> <code style="color:#888; font-size:0.78rem;">:${{p.port}}</code></div>
-                            <div style="font-size: 0.78rem; color: #888;">
-                                <a href="${{escHtml(url)}}" target="_blank" style="color:#2196F3;">${{escHtml(url)}}</a>
-                                <span> · ${{escHtml(owner)}}</span>
-                            </div>
-                        </div>
-                        <div style="display: flex; gap: 0.35rem; flex-shrink: 0;">
-                            <button class="small secondary" onclick="window.open('${{openUrl}}', '_blank')">Open</button>
-                            <button class="small danger" onclick="deletePreview('${{escHtml(ref)}}')">Delete</button>
-                        </div>
-                    </div>`;
-                }});
-                html += '</div>';
-                list.innerHTML = html;
-            }}
-
-            async function registerPreview() {{
-                const result = document.getElementById('preview-result');
-                const portInput = document.getElementById('preview-port-input');
-                const aliasInput = document.getElementById('preview-alias-input');
-                const nameInput = document.getElementById('preview-name-input');
-                const port = parseInt(portInput.value, 10);
-                const alias = aliasInput.value.trim();
-                const name = nameInput.value.trim();
-                result.style.display = 'block';
-                result.className = 'result';
-                if (!port || port < 1024 || port > 65535) {{
-                    result.className = 'result error';
-                    result.textContent = 'Enter a port from 1024 to 65535.';
-                    return;
-                }}
-                result.textContent = 'Registering preview...';
-                try {{
-                    const resp = await fetch(basePath + '/previews', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ port, alias, name }})
-                    }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Registration failed';
-                        return;
-                    }}
-                    const preview = data.preview || {{}};
-                    result.innerHTML = 'Registered: <a href="' + escHtml(preview.path) + '" target="_blank" style="color:#2196F3;">' + escHtml(preview.path) + '</a>';
-                    portInput.value = '';
-                    aliasInput.value = '';
-                    nameInput.value = '';
-                    fetchPreviews();
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function deletePreview(ref) {{
-                if (!confirm('Delete preview "' + ref + '"?')) return;
-                const result = document.getElementById('preview-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Deleting preview...';
-                try {{
-                    const resp = await fetch(basePath + '/previews/' + encodeURIComponent(ref), {{ method: 'DELETE' }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Delete failed';
-                    }} else {{
-                        result.textContent = data.removed ? 'Preview deleted.' : 'Preview was not found.';
-                        fetchPreviews();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Snapshots
-            async function createSnapshot() {{
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Creating snapshot...';
-                const nameInput = document.getElementById('snapshot-name-input');
-                const snapshotName = nameInput ? nameInput.value.trim() : '';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ name: snapshotName }})
-                    }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                    }} else {{
-                        result.innerHTML = 'Created: ' + escHtml(data.name) + ' (' + formatSize(data.size) + ') '
-                            + '<a href="' + basePath + '/snapshot/download/' + encodeURIComponent(data.name) + '" '
-                            + 'style="color: #2196F3; margin-left: 0.5rem;" download>Download</a>';
-                        if (nameInput) nameInput.value = '';
-                        fetchSnapshots();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function syncSnapshots() {{
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Syncing snapshots to host...';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/sync', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Sync failed';
-                    }} else {{
-                        result.textContent = 'Synced ' + (data.count || 0) + ' snapshot(s) to host';
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function fetchSnapshots() {{
-                const list = document.getElementById('snapshot-list');
-                const select = document.getElementById('snapshot-select');
-                list.innerHTML = '<p style="color: #888;">Loading...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot');
-                    const data = await resp.json();
-                    if (!data.snapshots || data.snapshots.length === 0) {{
-                        list.innerHTML = '<p style="color: #888; font-size: 0.85rem;">No snapshots yet.</p>';
-                        select.innerHTML = '<option value="latest">latest</option>';
-                        return;
-                    }}
-                    let html = '<div style="max-height: 300px; overflow-y: auto;">';
-                    let selectHtml = '<option value="latest">latest</option>';
-                    data.snapshots.forEach(s => {{
-                        const latest = s.latest ? ' <span style="color: #4CAF50;">(latest)</span>' : '';
-                        const displayLabel = s.label || 'snapshot';
-                        const displayName = displayLabel === 'snapshot' ? '' : `<strong>${{displayLabel}}</strong> · `;
-                        html += `<div style="padding: 0.4rem 0; border-bottom: 1px solid #333; font-size: 0.85rem; display: flex; justify-content: space-between; align-items: center; gap: 0.5rem;">
-                            <div style="flex: 1; min-width: 0;">
-                                <div>${{displayName}}<small style="color: #888;">${{s.created}}</small>${{latest}}</div>
-                                <div><code style="font-size: 0.75rem; color: #666;">${{s.name}}</code> · <small style="color: #888;">${{formatSize(s.size)}}</small></div>
-                            </div>
-                            <div style="display: flex; gap: 0.3rem; flex-shrink: 0;">
-                                <button onclick="openSnapshotBrowser('${{s.name}}')" style="background: #2196F3; color: white; border: none; padding: 0.2rem 0.5rem; border-radius: 3px; cursor: pointer; font-size: 0.75rem;">Browse</button>
-                                <button onclick="renameSnapshot('${{s.name}}')" style="background: #555; color: white; border: none; padding: 0.2rem 0.5rem; border-radius: 3px; cursor: pointer; font-size: 0.75rem;">Rename</button>
-                                <button onclick="deleteSnapshot('${{s.name}}')" style="background: #c62828; color: white; border: none; padding: 0.2rem 0.5rem; border-radius: 3px; cursor: pointer; font-size: 0.75rem;">Delete</button>
-                            </div>
-                        </div>`;
-                        const selectLabel = displayLabel === 'snapshot' ? s.created : `${{displayLabel}} (${{s.created}})`;
-                        selectHtml += `<option value="${{s.name}}">${{selectLabel}}</option>`;
-                    }});
-                    html += '</div>';
-                    list.innerHTML = html;
-                    select.innerHTML = selectHtml;
-                }} catch(e) {{
-                    list.innerHTML = `<p class="error" style="color: #ef9a9a;">Error: ${{e.message}}</p>`;
-                }}
-            }}
-
-            async function restoreSnapshot() {{
-                const select = document.getElementById('snapshot-select');
-                const snapshot = select.value;
-                const result = document.getElementById('restore-result');
-
-                if (!confirm(`Restore from "${{snapshot}}"? This will:\\n- Stop the gateway\\n- Replace current state with snapshot\\n- Restart the gateway\\n\\nCurrent state will be backed up.`)) {{
-                    return;
-                }}
-
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Restoring... (this may take a minute)';
-
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/restore', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ snapshot: snapshot }})
-                    }});
-                    const data = await resp.json();
-                    if (data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = 'Error: ' + (data.error || data.detail);
-                    }} else {{
-                        result.className = 'result';
-                        result.textContent = 'Restored from ' + data.snapshot + '. Backup at: ' + data.backup;
-                        if (data.warning) {{
-                            result.textContent += '\\nWarning: ' + data.warning;
-                        }}
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function deleteSnapshot(name) {{
-                if (!confirm(`Delete snapshot "${{name}}"?`)) return;
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Deleting...';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/delete', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ snapshot: name }})
-                    }});
-                    const data = await resp.json();
-                    if (data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = 'Error: ' + (data.error || data.detail);
-                    }} else {{
-                        result.textContent = 'Deleted: ' + data.deleted;
-                        fetchSnapshots();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function deleteAllSnapshots() {{
-                if (!confirm('Delete ALL snapshots? This cannot be undone.')) return;
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Deleting all snapshots...';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/delete', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ snapshot: 'all' }})
-                    }});
-                    const data = await resp.json();
-                    if (data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = 'Error: ' + (data.error || data.detail);
-                    }} else {{
-                        result.textContent = 'Deleted ' + data.deleted + ' snapshot(s)';
-                        fetchSnapshots();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function renameSnapshot(name) {{
-                const newName = prompt('Enter new name for snapshot:', '');
-                if (newName === null || newName.trim() === '') return;
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Renaming...';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/rename', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ snapshot: name, new_name: newName.trim() }})
-                    }});
-                    const data = await resp.json();
-                    if (data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = 'Error: ' + (data.error || data.detail);
-                    }} else {{
-                        result.textContent = 'Renamed to: ' + data.new_name;
-                        fetchSnapshots();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            function formatSize(bytes) {{
-                if (bytes < 1024) return bytes + ' B';
-                if (bytes < 1024*1024) return (bytes/1024).toFixed(1) + ' KB';
-                return (bytes/(1024*1024)).toFixed(1) + ' MB';
-            }}
-
-            function escapeHtml(str) {{
-                const d = document.createElement('div');
-                d.textContent = str;
-                return d.innerHTML;
-            }}
-
-            // ==================== Snapshot Browser ====================
-            let sbWorkspaceId = null;
-            let sbEditor = null;
-            let sbCurrentPath = null;
-            let sbDirty = false;
-            let sbCollapsedDirs = {{}};
-
-            function getModeForFile(filename) {{
-                const ext = filename.split('.').pop().toLowerCase();
-                const modes = {{
-                    'js': 'javascript', 'mjs': 'javascript', 'cjs': 'javascript',
-                    'json': {{name: 'javascript', json: true}},
-                    'ts': 'javascript', 'tsx': 'javascript', 'jsx': 'javascript',
-                    'py': 'python', 'pyw': 'python',
-                    'sh': 'shell', 'bash': 'shell', 'zsh': 'shell',
-                    'yml': 'yaml', 'yaml': 'yaml',
-                    'md': 'markdown', 'markdown': 'markdown',
-                    'toml': 'toml',
-                    'css': 'css', 'scss': 'css', 'less': 'css',
-                    'html': 'htmlmixed', 'htm': 'htmlmixed',
-                    'xml': 'xml', 'svg': 'xml',
-                }};
-                return modes[ext] || null;
-            }}
-
-            async function openSnapshotBrowser(name) {{
-                const result = document.getElementById('snapshot-result');
-                result.style.display = 'block';
-                result.textContent = 'Opening snapshot browser...';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/open', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ snapshot: name }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    sbWorkspaceId = data.workspace_id;
-                    document.getElementById('sb-snapshot-name').textContent = data.snapshot_name;
-                    document.getElementById('sb-save-name').value = '';
-                    document.getElementById('snapshot-browser-overlay').style.display = 'flex';
-                    result.style.display = 'none';
-                    sbCurrentPath = null;
-                    sbDirty = false;
-                    sbCollapsedDirs = {{}};
-                    showWelcome();
-                    await refreshFileTree();
-                    // Init CodeMirror if needed
-                    if (!sbEditor) {{
-                        const wrap = document.getElementById('sb-codemirror-wrap');
-                        sbEditor = CodeMirror(wrap, {{
-                            theme: 'material-darker',
-                            lineNumbers: true,
-                            matchBrackets: true,
-                            autoCloseBrackets: true,
-                            foldGutter: true,
-                            gutters: ['CodeMirror-linenumbers', 'CodeMirror-foldgutter'],
-                            readOnly: false,
-                            lineWrapping: true,
-                        }});
-                        sbEditor.on('change', () => {{ sbDirty = true; }});
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function closeSnapshotBrowser() {{
-                if (sbDirty && !confirm('You have unsaved changes. Close anyway?')) return;
-                if (sbWorkspaceId) {{
-                    try {{
-                        navigator.sendBeacon(basePath + '/snapshot/browse/close?token=' + encodeURIComponent(new URLSearchParams(window.location.search).get('token') || ''),
-                            new Blob([JSON.stringify({{workspace_id: sbWorkspaceId}})], {{type: 'application/json'}}));
-                    }} catch(e) {{}}
-                }}
-                sbWorkspaceId = null;
-                sbCurrentPath = null;
-                sbDirty = false;
-                document.getElementById('snapshot-browser-overlay').style.display = 'none';
-                fetchSnapshots();
-            }}
-
-            function showWelcome() {{
-                document.getElementById('sb-welcome').style.display = '';
-                document.getElementById('sb-binary-msg').style.display = 'none';
-                document.getElementById('sb-codemirror-wrap').style.display = 'none';
-                document.getElementById('sb-editor-toolbar').style.display = 'none';
-            }}
-
-            async function refreshFileTree() {{
-                if (!sbWorkspaceId) return;
-                const tree = document.getElementById('sb-file-tree');
-                tree.innerHTML = '<div style="padding:0.5rem; color:#888;">Loading...</div>';
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/files?workspace_id=' + encodeURIComponent(sbWorkspaceId));
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    const root = buildFileTree(data.files);
-                    tree.innerHTML = '';
-                    renderTree(root, tree, 0);
-                }} catch(e) {{
-                    tree.innerHTML = '<div style="padding:0.5rem; color:#ef9a9a;">Error: ' + e.message + '</div>';
-                }}
-            }}
-
-            function buildFileTree(files) {{
-                const root = {{ children: {{}}, files: [] }};
-                files.forEach(f => {{
-                    const parts = f.path.split('/');
-                    let node = root;
-                    if (f.is_dir) {{
-                        parts.forEach(p => {{
-                            if (!node.children[p]) node.children[p] = {{ children: {{}}, files: [] }};
-                            node = node.children[p];
-                        }});
-                        node._meta = f;
-                    }} else {{
-                        const dir = parts.slice(0, -1);
-                        dir.forEach(p => {{
-                            if (!node.children[p]) node.children[p] = {{ children: {{}}, files: [] }};
-                            node = node.children[p];
-                        }});
-                        node.files.push(f);
-                    }}
-                }});
-                return root;
-            }}
-
-            function renderTree(node, container, depth) {{
-                // Dirs first, sorted
-                const dirs = Object.keys(node.children).sort();
-                dirs.forEach(name => {{
-                    const child = node.children[name];
-                    const path = child._meta ? child._meta.path : name;
-                    const collapsed = sbCollapsedDirs[path];
-                    const div = document.createElement('div');
-                    const row = document.createElement('div');
-                    row.style.cssText = 'display:flex; align-items:center; padding:0.15rem 0.5rem; padding-left:' + (depth * 16 + 8) + 'px; cursor:pointer; color:#e0e0e0; white-space:nowrap;';
-                    row.onmouseover = () => {{ row.style.background = '#2a2a2a'; acts.style.visibility = 'visible'; }};
-                    row.onmouseout = () => {{ row.style.background = ''; acts.style.visibility = 'hidden'; }};
-
-                    const arrow = document.createElement('span');
-                    arrow.style.cssText = 'width:16px; text-align:center; flex-shrink:0; color:#888; font-size:0.7rem;';
-                    arrow.textContent = collapsed ? '\u25b6' : '\u25bc';
-                    row.appendChild(arrow);
-
-                    const label = document.createElement('span');
-                    label.style.cssText = 'flex:1; overflow:hidden; text-overflow:ellipsis; color:#90CAF9;';
-                    label.textContent = name;
-                    row.appendChild(label);
-
-                    const acts = document.createElement('span');
-                    acts.style.cssText = 'visibility:hidden; display:flex; gap:0.2rem; flex-shrink:0;';
-                    function mkAct(label, color, handler) {{
-                        const s = document.createElement('span');
-                        s.textContent = label;
-                        s.title = label === '\u2b07' ? 'Download' : label === '\u270e' ? 'Rename' : label === '\u29c9' ? 'Duplicate' : 'Delete';
-                        s.style.cssText = 'cursor:pointer; color:' + color + '; font-size:0.7rem;';
-                        s.onclick = (e) => {{ e.stopPropagation(); handler(); }};
-                        return s;
-                    }}
-                    acts.appendChild(mkAct('\u2b07', '#4CAF50', () => downloadDir(path)));
-                    acts.appendChild(mkAct('\u270e', '#888', () => renameItem(path)));
-                    acts.appendChild(mkAct('\u29c9', '#888', () => duplicateItem(path)));
-                    acts.appendChild(mkAct('\u2715', '#c62828', () => deleteItem(path)));
-                    row.appendChild(acts);
-
-                    row.onclick = () => {{
-                        sbCollapsedDirs[path] = !sbCollapsedDirs[path];
-                        refreshFileTree();
-                    }};
-                    div.appendChild(row);
-
-                    if (!collapsed) {{
-                        const sub = document.createElement('div');
-                        renderTree(child, sub, depth + 1);
-                        div.appendChild(sub);
-                    }}
-                    container.appendChild(div);
-                }});
-
-                // Files, sorted
-                const files = (node.files || []).sort((a, b) => a.path.localeCompare(b.path));
-                files.forEach(f => {{
-                    const fname = f.path.split('/').pop();
-                    const row = document.createElement('div');
-                    row.style.cssText = 'display:flex; align-items:center; padding:0.15rem 0.5rem; padding-left:' + (depth * 16 + 24) + 'px; cursor:pointer; color:#e0e0e0; white-space:nowrap;';
-                    if (f.path === sbCurrentPath) row.style.background = '#2a3a2a';
-                    row.onmouseover = () => {{ if (f.path !== sbCurrentPath) row.style.background = '#2a2a2a'; acts.style.visibility = 'visible'; }};
-                    row.onmouseout = () => {{ if (f.path !== sbCurrentPath) row.style.background = ''; acts.style.visibility = 'hidden'; }};
-
-                    const icon = document.createElement('span');
-                    icon.style.cssText = 'width:16px; text-align:center; flex-shrink:0; color:#888; font-size:0.65rem;';
-                    icon.textContent = f.is_binary ? '\u25a0' : '\u25a1';
-                    row.appendChild(icon);
-
-                    const label = document.createElement('span');
-                    label.style.cssText = 'flex:1; overflow:hidden; text-overflow:ellipsis;';
-                    label.textContent = fname;
-                    row.appendChild(label);
-
-                    const size = document.createElement('span');
-                    size.style.cssText = 'color:#666; font-size:0.7rem; margin-left:0.5rem; flex-shrink:0;';
-                    size.textContent = formatSize(f.size);
-                    row.appendChild(size);
-
-                    const acts = document.createElement('span');
-                    acts.style.cssText = 'visibility:hidden; display:flex; gap:0.2rem; flex-shrink:0; margin-left:0.3rem;';
-                    const renBtn = document.createElement('span');
-                    renBtn.textContent = '\u270e';
-                    renBtn.title = 'Rename';
-                    renBtn.style.cssText = 'cursor:pointer; color:#888; font-size:0.7rem;';
-                    renBtn.onclick = (e) => {{ e.stopPropagation(); renameItem(f.path); }};
-                    acts.appendChild(renBtn);
-                    const delBtn = document.createElement('span');
-                    delBtn.textContent = '\u2715';
-                    delBtn.title = 'Delete';
-                    delBtn.style.cssText = 'cursor:pointer; color:#c62828; font-size:0.7rem;';
-                    delBtn.onclick = (e) => {{ e.stopPropagation(); deleteItem(f.path); }};
-                    acts.appendChild(delBtn);
-                    row.appendChild(acts);
-
-                    row.onclick = () => openFile(f.path);
-                    container.appendChild(row);
-                }});
-            }}
-
-            async function openFile(path) {{
-                if (sbDirty && sbCurrentPath && !confirm('Discard unsaved changes to ' + sbCurrentPath + '?')) return;
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/file?workspace_id=' + encodeURIComponent(sbWorkspaceId) + '&path=' + encodeURIComponent(path));
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-
-                    sbCurrentPath = path;
-                    document.getElementById('sb-current-file').textContent = path;
-                    document.getElementById('sb-editor-toolbar').style.display = 'flex';
-                    document.getElementById('sb-welcome').style.display = 'none';
-
-                    if (data.binary) {{
-                        document.getElementById('sb-binary-msg').style.display = '';
-                        document.getElementById('sb-codemirror-wrap').style.display = 'none';
-                        document.getElementById('sb-save-btn').style.display = 'none';
-                    }} else {{
-                        document.getElementById('sb-binary-msg').style.display = 'none';
-                        document.getElementById('sb-codemirror-wrap').style.display = '';
-                        document.getElementById('sb-save-btn').style.display = '';
-                        const mode = getModeForFile(path);
-                        sbEditor.setOption('mode', mode);
-                        sbEditor.setValue(data.content || '');
-                        sbDirty = false;
-                        setTimeout(() => sbEditor.refresh(), 10);
-                    }}
-                    refreshFileTree();
-                }} catch(e) {{
-                    alert('Error opening file: ' + e.message);
-                }}
-            }}
-
-            async function saveCurrentFile() {{
-                if (!sbCurrentPath || !sbWorkspaceId) return;
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/file', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ workspace_id: sbWorkspaceId, path: sbCurrentPath, content: sbEditor.getValue() }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    sbDirty = false;
-                    const btn = document.getElementById('sb-save-btn');
-                    const orig = btn.textContent;
-                    btn.textContent = 'Saved!';
-                    btn.style.background = '#2E7D32';
-                    setTimeout(() => {{ btn.textContent = orig; btn.style.background = ''; }}, 1500);
-                }} catch(e) {{
-                    alert('Save failed: ' + e.message);
-                }}
-            }}
-
-            async function renameItem(path) {{
-                const oldName = path.split('/').pop();
-                const newName = prompt('Rename "' + oldName + '" to:', oldName);
-                if (!newName || newName === oldName) return;
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/rename', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ workspace_id: sbWorkspaceId, path: path, new_name: newName }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    if (sbCurrentPath === path) {{ sbCurrentPath = null; showWelcome(); }}
-                    refreshFileTree();
-                }} catch(e) {{
-                    alert('Rename failed: ' + e.message);
-                }}
-            }}
-
-            async function duplicateItem(path) {{
-                const name = path.split('/').pop();
-                const ext = name.includes('.') ? '.' + name.split('.').pop() : '';
-                const base = ext ? name.slice(0, -ext.length) : name;
-                const destName = prompt('Duplicate "' + name + '" as:', base + '-copy' + ext);
-                if (!destName) return;
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/duplicate', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ workspace_id: sbWorkspaceId, path: path, dest_name: destName }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    refreshFileTree();
-                }} catch(e) {{
-                    alert('Duplicate failed: ' + e.message);
-                }}
-            }}
-
-            async function deleteItem(path) {{
-                if (!confirm('Delete "' + path.split('/').pop() + '"?')) return;
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/delete-file', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ workspace_id: sbWorkspaceId, path: path }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    if (sbCurrentPath === path) {{ sbCurrentPath = null; showWelcome(); }}
-                    refreshFileTree();
-                }} catch(e) {{
-                    alert('Delete failed: ' + e.message);
-                }}
-            }}
-
-            function handleDragOver(e) {{
-                e.preventDefault();
-                e.stopPropagation();
-                e.currentTarget.style.borderColor = '#4CAF50';
-                e.currentTarget.style.background = '#1a2a1a';
-            }}
-
-            async function handleFileDrop(e) {{
-                e.preventDefault();
-                e.stopPropagation();
-                e.currentTarget.style.borderColor = '#333';
-                e.currentTarget.style.background = 'transparent';
-                if (!sbWorkspaceId) return;
-                const files = e.dataTransfer.files;
-                for (let i = 0; i < files.length; i++) {{
-                    const file = files[i];
-                    const formData = new FormData();
-                    formData.append('workspace_id', sbWorkspaceId);
-                    formData.append('path', '');
-                    formData.append('file', file);
-                    try {{
-                        const resp = await fetch(basePath + '/snapshot/browse/upload', {{
-                            method: 'POST',
-                            body: formData
-                        }});
-                        const data = await resp.json();
-                        if (data.detail) throw new Error(data.detail);
-                    }} catch(err) {{
-                        alert('Upload failed for ' + file.name + ': ' + err.message);
-                    }}
-                }}
-                refreshFileTree();
-            }}
-
-            async function saveWorkspaceAsSnapshot() {{
-                if (!sbWorkspaceId) return;
-                const name = document.getElementById('sb-save-name').value.trim();
-                try {{
-                    const resp = await fetch(basePath + '/snapshot/browse/save', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ workspace_id: sbWorkspaceId, name: name }})
-                    }});
-                    const data = await resp.json();
-                    if (data.detail) throw new Error(data.detail);
-                    let msg = 'Snapshot created: ' + data.name + ' (' + formatSize(data.size) + ')';
-                    if (data.synced) msg += ' — synced to host';
-                    alert(msg);
-                }} catch(e) {{
-                    alert('Save failed: ' + e.message);
-                }}
-            }}
-
-            function downloadCurrentFile() {{
-                if (!sbCurrentPath || !sbWorkspaceId) return;
-                const url = basePath + '/snapshot/browse/file/download?workspace_id=' + encodeURIComponent(sbWorkspaceId) + '&path=' + encodeURIComponent(sbCurrentPath);
-                window.open(url, '_blank');
-            }}
-
-            function downloadDir(path) {{
-                const url = basePath + '/snapshot/browse/file/download?workspace_id=' + encodeURIComponent(sbWorkspaceId) + '&path=' + encodeURIComponent(path);
-                window.open(url, '_blank');
-            }}
-
-            window.addEventListener('beforeunload', (e) => {{
-                if (sbWorkspaceId) {{
-                    e.preventDefault();
-                    e.returnValue = '';
-                    try {{
-                        navigator.sendBeacon(basePath + '/snapshot/browse/close?token=' + encodeURIComponent(new URLSearchParams(window.location.search).get('token') || ''),
-                            new Blob([JSON.stringify({{workspace_id: sbWorkspaceId}})], {{type: 'application/json'}}));
-                    }} catch(ex) {{}}
-                }}
-            }});
-
-            // Store config path for editor links
-            let configHostPath = '';
-
-            // Parse JSON error to extract line/column
-            function parseJsonError(errorMsg, jsonText) {{
-                // Try to extract position from error message
-                // Common formats: "at position 123", "at line 5 column 10", "Unexpected token X in JSON at position 456"
-                let line = 1, col = 1, pos = -1;
-
-                const posMatch = errorMsg.match(/position\s+(\d+)/i);
-                if (posMatch) {{
-                    pos = parseInt(posMatch[1]);
-                    // Convert position to line/column
-                    let currentPos = 0;
-                    const lines = jsonText.split('\\n');
-                    for (let i = 0; i < lines.length; i++) {{
-                        if (currentPos + lines[i].length >= pos) {{
-                            line = i + 1;
-                            col = pos - currentPos + 1;
-                            break;
-                        }}
-                        currentPos += lines[i].length + 1; // +1 for newline
-                    }}
-                }}
-
-                const lineMatch = errorMsg.match(/line\s+(\d+)/i);
-                if (lineMatch) line = parseInt(lineMatch[1]);
-
-                const colMatch = errorMsg.match(/column\s+(\d+)/i);
-                if (colMatch) col = parseInt(colMatch[1]);
-
-                return {{ line, col, pos }};
-            }}
-
-            // Format JSON error with clickable link
-            function formatJsonError(errorMsg, jsonText) {{
-                const {{ line, col }} = parseJsonError(errorMsg, jsonText);
-                let html = `<span style="color: #ef9a9a;">Invalid JSON: ${{errorMsg}}</span><br>`;
-                if (configHostPath) {{
-                    const vscodeUrl = `vscode://file/${{window.location.origin.includes('localhost') ? '/Users/elimaine/code/clawfactory/' : ''}}${{configHostPath}}:${{line}}:${{col}}`;
-                    html += `<a href="${{vscodeUrl}}" style="color: #2196F3;">Open in VS Code at line ${{line}}</a>`;
-                    html += ` | <a href="#" onclick="jumpToLine(${{line}}); return false;" style="color: #4CAF50;">Jump to line ${{line}}</a>`;
-                }} else {{
-                    html += `<a href="#" onclick="jumpToLine(${{line}}); return false;" style="color: #4CAF50;">Jump to line ${{line}}</a>`;
-                }}
-                return html;
-            }}
-
-            // Jump to line in CodeMirror editor
-            function jumpToLine(lineNum) {{
-                if (!configEditor) return;
-                const line = lineNum - 1;
-                configEditor.focus();
-                configEditor.setCursor({{ line: line, ch: 0 }});
-                configEditor.setSelection(
-                    {{ line: line, ch: 0 }},
-                    {{ line: line, ch: configEditor.getLine(line)?.length || 0 }}
-                );
-                // Scroll to center the line
-                const coords = configEditor.charCoords({{ line: line, ch: 0 }}, 'local');
-                configEditor.scrollTo(null, coords.top - configEditor.getScrollInfo().clientHeight / 2);
-            }}
-
-            // Config editor
-            async function loadConfig() {{
-                const result = document.getElementById('config-result');
-                const ollamaDiv = document.getElementById('ollama-models');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Loading...';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/config');
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                        return;
-                    }}
-                    setEditorValue(JSON.stringify(data.config, null, 2));
-                    configHostPath = data.config_path || '';
-
-                    // Show Ollama models if available
-                    if (data.ollama_models && data.ollama_models.length > 0) {{
-                        // Store raw model data globally
-                        window.ollamaModelsRaw = data.ollama_models;
-
-                        renderOllamaModels();
-                    }} else {{
-                        ollamaDiv.innerHTML = '<p style="color: #888; font-size: 0.85rem;">No Ollama models detected. Is Ollama running?</p>';
-                    }}
-
-                    result.textContent = 'Config loaded. Validating...';
-                    // Also validate the config
-                    validateConfig();
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function saveConfig() {{
-                const result = document.getElementById('config-result');
-                const editorValue = getEditorValue();
-
-                // Validate JSON first
-                let config;
-                try {{
-                    config = JSON.parse(editorValue);
-                }} catch(e) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.innerHTML = formatJsonError(e.message, editorValue);
-                    return;
-                }}
-
-                if (!confirm('This will stop the gateway, save the config, and restart. Continue?')) return;
-
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Saving config and restarting gateway...';
-
-                try {{
-                    const resp = await fetch(basePath + '/gateway/config', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ config }})
-                    }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        let errMsg = escapeHtml(data.error || data.detail || 'Unknown error');
-                        if (data.validation_errors && data.validation_errors.length) {{
-                            errMsg += '<br><ul style="margin: 0.3rem 0 0 1rem; padding: 0;">';
-                            data.validation_errors.forEach(e => {{ errMsg += '<li>' + escapeHtml(e) + '</li>'; }});
-                            errMsg += '</ul>';
-                        }}
-                        result.innerHTML = errMsg;
-                    }} else {{
-                        result.textContent = 'Config saved. Gateway restarting...';
-                        // Check for backup after save
-                        checkConfigBackup();
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function checkConfigBackup() {{
-                try {{
-                    const resp = await fetch(basePath + '/gateway/config/known-good');
-                    const data = await resp.json();
-                    const btn = document.getElementById('revert-config-btn');
-                    if (btn) {{
-                        if (data.has_backup) {{
-                            const ts = data.timestamp ? new Date(data.timestamp).toLocaleString() : '';
-                            btn.style.display = 'inline-block';
-                            btn.title = 'Backup from: ' + ts;
-                        }} else {{
-                            btn.style.display = 'none';
-                        }}
-                    }}
-                }} catch(e) {{
-                    console.error('Error checking backup:', e);
-                }}
-            }}
-
-            async function revertConfig() {{
-                if (!confirm('Revert to the last known-good config? This will restart the gateway.')) return;
-
-                const result = document.getElementById('config-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Reverting config...';
-
-                try {{
-                    const resp = await fetch(basePath + '/gateway/config/revert', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                    }} else {{
-                        result.innerHTML = '<span style="color: #4CAF50;">Config reverted. Gateway restarting...</span>';
-                        // Reload config into editor
-                        setTimeout(() => loadConfig(), 2000);
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            function formatConfig() {{
-                const result = document.getElementById('config-result');
-                const editorValue = getEditorValue();
-                try {{
-                    const config = JSON.parse(editorValue);
-                    setEditorValue(JSON.stringify(config, null, 2));
-                    result.style.display = 'block';
-                    result.className = 'result';
-                    result.textContent = 'JSON formatted.';
-                }} catch(e) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.innerHTML = formatJsonError(e.message, editorValue);
-                }}
-            }}
-
-            async function validateConfig() {{
-                const result = document.getElementById('config-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Validating config...';
-
-                const editorValue = getEditorValue();
-                let config;
-                try {{
-                    config = JSON.parse(editorValue);
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.innerHTML = formatJsonError(e.message, editorValue);
-                    return;
-                }}
-
-                try {{
-                    const resp = await fetch(basePath + '/gateway/config/validate', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ config }})
-                    }});
-                    const data = await resp.json();
-
-                    if (data.error) {{
-                        result.className = 'result error';
-                        result.textContent = data.error;
-                        return;
-                    }}
-
-                    if (data.valid) {{
-                        result.innerHTML = '<span style="color: #4CAF50;">Config is valid</span>';
-                    }} else {{
-                        let html = '<span style="color: #ef9a9a; font-weight: bold;">Config has errors:</span><br>';
-                        if (data.issues && data.issues.length > 0) {{
-                            data.issues.forEach(issue => {{
-                                const color = issue.severity === 'error' ? '#ef9a9a' : '#ffcc80';
-                                html += `<div style="margin: 0.3rem 0; padding: 0.3rem; background: #333; border-radius: 3px;">`;
-                                html += `<span style="color: ${{color}};">${{issue.message}}</span>`;
-                                if (issue.key) {{
-                                    html += ` <a href="#" onclick="searchInEditor('${{issue.key}}'); return false;" style="color: #2196F3; font-size: 0.85rem;">Find in editor</a>`;
-                                }}
-                                html += `</div>`;
-                            }});
-                        }}
-                        if (data.raw) {{
-                            html += `<pre style="margin-top: 0.5rem; font-size: 0.75rem; color: #888; white-space: pre-wrap;">${{data.raw}}</pre>`;
-                        }}
-                        result.className = 'result error';
-                        result.innerHTML = html;
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            function searchInEditor(text) {{
-                if (!configEditor) return;
-                const cursor = configEditor.getSearchCursor(text);
-                if (cursor.findNext()) {{
-                    configEditor.setSelection(cursor.from(), cursor.to());
-                    configEditor.scrollIntoView({{ from: cursor.from(), to: cursor.to() }}, 100);
-                    configEditor.focus();
-                }}
-            }}
-
-            // Calculate safe context window based on RAM and model size
-            function calcSafeContext(paramBillions, maxContext, availableRamGb) {{
-                // Model weights (Q4 quantized): ~0.5-0.6 GB per billion params
-                const modelRam = paramBillions * 0.6;
-                // System overhead
-                const systemRam = 6;
-                // Available for KV cache
-                const kvRam = availableRamGb - modelRam - systemRam;
-
-                if (kvRam <= 0) return 4096; // Minimum
-
-                // KV cache estimates (fp16, typical GQA models):
-                // - 7B model: ~0.5GB per 8k context
-                // - 14B model: ~1GB per 8k context
-                // - 32B model: ~2GB per 8k context (GQA helps)
-                // - 70B model: ~4GB per 8k context
-                // Formula: GB per 8k ≈ paramBillions * 0.06
-                const gbPer8k = paramBillions * 0.06;
-                const maxContextFromRam = Math.floor((kvRam / gbPer8k) * 8192);
-
-                // Cap at model's actual max and round to nice number
-                let safeContext = Math.min(maxContextFromRam, maxContext);
-                // Round down to nearest 4k
-                safeContext = Math.floor(safeContext / 4096) * 4096;
-                // Minimum 4k, max what model supports
-                return Math.max(4096, Math.min(safeContext, maxContext));
-            }}
-
-            function renderOllamaModels() {{
-                const ollamaDiv = document.getElementById('ollama-models');
-                const availableRam = parseInt(document.getElementById('available-ram').value) || 64;
-                const editorValue = getEditorValue();
-
-                if (!window.ollamaModelsRaw || window.ollamaModelsRaw.length === 0) {{
-                    ollamaDiv.innerHTML = '<p style="color: #888; font-size: 0.85rem;">No Ollama models detected.</p>';
-                    return;
-                }}
-
-                // Get already configured model IDs
-                let configuredIds = new Set();
-                try {{
-                    const config = JSON.parse(editorValue);
-                    const models = config?.models?.providers?.ollama?.models || [];
-                    models.forEach(m => configuredIds.add(m.id));
-                }} catch(e) {{
-                    // Ignore parse errors
-                }}
-
-                // Build config entries with RAM-adjusted context
-                window.ollamaModels = {{}};
-                window.ollamaModelsRaw.forEach(m => {{
-                    const safeCtx = calcSafeContext(m.param_billions || 7, m.context_window || 4096, availableRam);
-                    window.ollamaModels[m.id] = {{
-                        id: m.id,
-                        name: m.friendly_name,
-                        reasoning: m.reasoning,
-                        input: ["text"],
-                        cost: {{ input: 0, output: 0, cacheRead: 0, cacheWrite: 0 }},
-                        contextWindow: safeCtx,
-                        maxTokens: Math.min(Math.floor(safeCtx / 4), 8192)
-                    }};
-                }});
-
-                // Filter out models already in config
-                const availableModels = window.ollamaModelsRaw.filter(m => !configuredIds.has(m.id));
-
-                if (availableModels.length === 0) {{
-                    ollamaDiv.innerHTML = '<p style="color: #888; font-size: 0.85rem;">All Ollama models already in config.</p>';
-                    return;
-                }}
-
-                let html = '<div style="background: #252525; padding: 0.5rem; border-radius: 4px; margin-bottom: 0.5rem;">';
-                html += '<strong style="color: #4CAF50;">Ollama Models:</strong> ';
-                html += '<span style="color: #888; font-size: 0.85rem;">(click to add to config, context adjusted for ' + availableRam + 'GB RAM)</span><br>';
-                availableModels.forEach(m => {{
-                    const safeCtx = window.ollamaModels[m.id].contextWindow;
-                    const maxCtx = m.context_window || 4096;
-                    const reasoningBadge = m.reasoning ? ' <span style="color: #ff9800; font-size: 0.7rem;">⚡reasoning</span>' : '';
-                    const ctxColor = safeCtx < maxCtx ? '#ff9800' : '#4CAF50';
-                    const ctxStr = ` <span style="color: ${{ctxColor}}; font-size: 0.7rem;">${{(safeCtx/1024).toFixed(0)}}k</span>`;
-                    const paramStr = m.parameters ? ` <span style="color: #666; font-size: 0.7rem;">${{m.parameters}}</span>` : '';
-                    html += `<code style="cursor: pointer; background: #333; padding: 0.2rem 0.4rem; margin: 0.2rem; display: inline-block; border-radius: 3px;" onclick="addOllamaModel('${{m.id}}')">${{m.id}}${{paramStr}}${{ctxStr}}${{reasoningBadge}}</code>`;
-                }});
-                html += '</div>';
-                ollamaDiv.innerHTML = html;
-            }}
-
-            // Re-render when RAM changes
-            document.getElementById('available-ram').addEventListener('change', renderOllamaModels);
-
-            // Note: Cursor position and live JSON validation are handled by CodeMirror events (see initialization above)
-
-            function addOllamaModel(modelId) {{
-                const result = document.getElementById('config-result');
-                const editorValue = getEditorValue();
-
-                if (!window.ollamaModels || !window.ollamaModels[modelId]) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.textContent = 'Model config not found. Reload config first.';
-                    return;
-                }}
-
-                let config;
-                try {{
-                    config = JSON.parse(editorValue);
-                }} catch(e) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.textContent = 'Invalid JSON in editor. Load config first.';
-                    return;
-                }}
-
-                // Ensure path exists: models.providers.ollama.models
-                if (!config.models) config.models = {{}};
-                if (!config.models.providers) config.models.providers = {{}};
-                if (!config.models.providers.ollama) {{
-                    config.models.providers.ollama = {{
-                        baseUrl: "{"http://host.lima.internal:11434/v1" if IS_LIMA_MODE else "http://host.docker.internal:11434/v1"}",
-                        apiKey: "ollama-local",
-                        models: []
-                    }};
-                }}
-                if (!config.models.providers.ollama.models) {{
-                    config.models.providers.ollama.models = [];
-                }}
-
-                // Check if already exists
-                const existing = config.models.providers.ollama.models.find(m => m.id === modelId);
-                if (existing) {{
-                    result.style.display = 'block';
-                    result.className = 'result';
-                    result.textContent = modelId + ' already in config.';
-                    return;
-                }}
-
-                // Add the model
-                config.models.providers.ollama.models.push(window.ollamaModels[modelId]);
-                setEditorValue(JSON.stringify(config, null, 2));
-
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Added ' + modelId + ' to config. Click Save & Restart to apply.';
-
-                // Re-render to remove the button
-                renderOllamaModels();
-            }}
-
-            // Tab switching
-            function showTab(tabName) {{
-                document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-                document.querySelectorAll('.tab-button').forEach(b => b.classList.remove('active'));
-                document.getElementById('tab-' + tabName).classList.add('active');
-                event.target.classList.add('active');
-            }}
-
-            // Device pairing
-            async function fetchDevices() {{
-                const list = document.getElementById('devices-list');
-                list.innerHTML = '<p style="color: #888;">Loading...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/devices');
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        list.innerHTML = `<p class="error" style="color: #ef9a9a;">${{data.error || data.detail || 'Unknown error'}}</p>`;
-                        return;
-                    }}
-                    let html = '';
-                    if (data.pending && data.pending.length > 0) {{
-                        html += '<h3>Pending Approval</h3>';
-                        data.pending.forEach(d => {{
-                            html += `<div class="pending-item">
-                                <div class="pending-item-info">
-                                    <strong>${{d.displayName || d.deviceId}}</strong><br>
-                                    <small style="color: #888;">Role: ${{d.role || 'unknown'}} | IP: ${{d.remoteIp || '?'}}</small>
-                                </div>
-                                <div class="pending-item-actions">
-                                    <button class="small" onclick="approveDevice('${{d.requestId}}')">Approve</button>
-                                    <button class="small danger" onclick="rejectDevice('${{d.requestId}}')">Reject</button>
-                                </div>
-                            </div>`;
-                        }});
-                    }} else {{
-                        html += '<p style="color: #888; font-size: 0.85rem;">No pending device requests.</p>';
-                    }}
-                    if (data.paired && data.paired.length > 0) {{
-                        html += '<h3>Paired Devices</h3>';
-                        data.paired.forEach(d => {{
-                            html += `<div class="pending-item" style="background: #2a3a2a;">
-                                <div class="pending-item-info">
-                                    <strong>${{d.displayName || d.deviceId}}</strong><br>
-                                    <small style="color: #888;">Roles: ${{(d.roles || []).join(', ') || 'none'}}</small>
-                                </div>
-                            </div>`;
-                        }});
-                    }}
-                    list.innerHTML = html || '<p style="color: #888;">No devices.</p>';
-                }} catch(e) {{
-                    list.innerHTML = `<p class="error" style="color: #ef9a9a;">Error: ${{e.message}}</p>`;
-                }}
-            }}
-
-            async function approveDevice(requestId) {{
-                const result = document.getElementById('devices-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/devices/approve', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ requestId }})
-                    }});
-                    const data = await resp.json();
-                    result.textContent = data.status || JSON.stringify(data);
-                    fetchDevices();
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function rejectDevice(requestId) {{
-                const result = document.getElementById('devices-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/devices/reject', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ requestId }})
-                    }});
-                    const data = await resp.json();
-                    result.textContent = data.status || JSON.stringify(data);
-                    fetchDevices();
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Channel pairing (new unified view)
-            async function fetchChannelPairing(channel) {{
-                const pendingDiv = document.getElementById(channel + '-pending');
-                const statusSpan = document.getElementById(channel + '-status');
-
-                if (pendingDiv) pendingDiv.innerHTML = '<span style="color: #888;">Loading...</span>';
-
-                try {{
-                    const resp = await fetch(basePath + '/gateway/pairing/' + channel);
-                    const data = await resp.json();
-
-                    if (data.error) {{
-                        if (pendingDiv) pendingDiv.innerHTML = `<span style="color: #ef9a9a;">${{data.error}}</span>`;
-                        if (statusSpan) {{
-                            statusSpan.textContent = 'error';
-                            statusSpan.className = 'channel-status error';
-                        }}
-                        return;
-                    }}
-
-                    const pending = data.pending || [];
-                    if (statusSpan) {{
-                        if (pending.length > 0) {{
-                            statusSpan.textContent = pending.length + ' pending';
-                            statusSpan.className = 'channel-status pending';
-                        }} else {{
-                            statusSpan.textContent = 'ready';
-                            statusSpan.className = 'channel-status connected';
-                        }}
-                    }}
-
-                    if (pendingDiv) {{
-                        if (pending.length > 0) {{
-                            let html = '';
-                            pending.forEach(p => {{
-                                const sender = (p.senderId || p.userId || 'unknown').replace(/'/g, "&#39;");
-                                html += `<div style="background: #252525; padding: 0.5rem; border-radius: 3px; margin-bottom: 0.5rem; display: flex; justify-content: space-between; align-items: center; gap: 0.5rem;">
-                                    <div style="flex: 1; min-width: 0; overflow: hidden;">
-                                        <strong style="color: #ff9800;">${{p.code}}</strong>
-                                        <span style="color: #888; font-size: 0.8rem; margin-left: 0.5rem;">from ${{sender}}</span>
-                                    </div>
-                                    <button class="small" onclick="approvePairingInline('${{channel}}', '${{p.code}}')">Approve</button>
-                                </div>`;
-                            }});
-                            pendingDiv.innerHTML = html;
-                        }} else {{
-                            pendingDiv.innerHTML = '<span style="color: #4CAF50;">No pending requests</span>';
-                        }}
-                    }}
-                }} catch(e) {{
-                    if (pendingDiv) pendingDiv.innerHTML = `<span style="color: #ef9a9a;">Error: ${{e.message}}</span>`;
-                    if (statusSpan) {{
-                        statusSpan.textContent = 'error';
-                        statusSpan.className = 'channel-status error';
-                    }}
-                }}
-            }}
-
-            async function refreshAllChannels() {{
-                const channels = ['discord', 'telegram', 'slack'];
-                await Promise.all(channels.map(ch => fetchChannelPairing(ch)));
-            }}
-
-            // Legacy function for backwards compatibility
-            async function fetchPairing(channel) {{
-                return fetchChannelPairing(channel);
-            }}
-
-            async function approvePairingInline(channel, code) {{
-                const result = document.getElementById('pairing-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = `Approving ${{code}} on ${{channel}}...`;
-                try {{
-                    const resp = await fetch(basePath + '/gateway/pairing/approve', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ channel, code }})
-                    }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                    }} else {{
-                        result.textContent = data.status || 'Approved!';
-                        fetchChannelPairing(channel);
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function approvePairingCode() {{
-                const channel = document.getElementById('pairing-channel').value;
-                const code = document.getElementById('pairing-code').value.toUpperCase().trim();
-                const result = document.getElementById('pairing-result');
-                if (!code) {{
-                    result.style.display = 'block';
-                    result.className = 'result error';
-                    result.textContent = 'Please enter a pairing code';
-                    return;
-                }}
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Approving...';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/pairing/approve', {{
-                        method: 'POST',
-                        headers: {{ 'Content-Type': 'application/json' }},
-                        body: JSON.stringify({{ channel, code }})
-                    }});
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                    }} else {{
-                        result.textContent = data.status || 'Approved!';
-                        document.getElementById('pairing-code').value = '';
-                    }}
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Security audit
-            async function runSecurityAudit(deep = false) {{
-                const result = document.getElementById('security-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.innerHTML = '<p style="color: #888;">Running security audit' + (deep ? ' (deep)' : '') + '...</p>';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/security-audit?deep=' + deep);
-                    const data = await resp.json();
-                    if (!resp.ok || data.error || data.detail) {{
-                        result.className = 'result error';
-                        result.textContent = data.error || data.detail || 'Unknown error';
-                        return;
-                    }}
-                    // Format the security audit nicely
-                    let html = '<h3 style="margin: 0 0 0.5rem 0;">Security Audit</h3>';
-                    const s = data.summary || {{}};
-                    const criticalColor = s.critical > 0 ? '#ef9a9a' : '#a5d6a7';
-                    const warnColor = s.warn > 0 ? '#ffcc80' : '#a5d6a7';
-                    html += `<p><span style="color: ${{criticalColor}};">${{s.critical || 0}} critical</span> · `;
-                    html += `<span style="color: ${{warnColor}};">${{s.warn || 0}} warnings</span> · `;
-                    html += `<span style="color: #888;">${{s.info || 0}} info</span></p>`;
-                    if (data.findings && data.findings.length > 0) {{
-                        html += '<div style="margin-top: 0.5rem;">';
-                        data.findings.forEach(f => {{
-                            const severityColor = f.severity === 'critical' ? '#ef9a9a' :
-                                                  f.severity === 'warn' ? '#ffcc80' : '#888';
-                            html += `<div style="margin: 0.5rem 0; padding: 0.5rem; background: #333; border-radius: 4px;">`;
-                            html += `<strong style="color: ${{severityColor}};">[${{f.severity.toUpperCase()}}]</strong> ${{f.title}}<br>`;
-                            html += `<small style="color: #888;">${{f.detail || ''}}</small>`;
-                            if (f.remediation) {{
-                                html += `<br><small style="color: #4CAF50;">Fix: ${{f.remediation}}</small>`;
-                            }}
-                            html += '</div>';
-                        }});
-                        html += '</div>';
-                    }} else {{
-                        html += '<p style="color: #a5d6a7;">No findings.</p>';
-                    }}
-                    result.innerHTML = html;
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function restartGateway() {{
-                const result = document.getElementById('promote-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Restarting gateway...';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/restart', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    result.textContent = data.status || JSON.stringify(data);
-                    setTimeout(fetchHealth, 3000);
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function killswitch() {{
-                if (!confirm('KILLSWITCH: This will snapshot, stop the gateway, and signal the host to shut down this instance. Continue?')) return;
-                const result = document.getElementById('promote-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Killswitch activated — shutting down...';
-                try {{
-                    const resp = await fetch(basePath + '/killswitch', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    result.textContent = data.status || JSON.stringify(data);
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function rebuildGateway() {{
-                const result = document.getElementById('promote-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Rebuilding gateway...';
-                try {{
-                    const resp = await fetch(basePath + '/gateway/rebuild', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    result.textContent = data.status || JSON.stringify(data);
-                    setTimeout(fetchHealth, 5000);
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            async function pullUpstream() {{
-                const result = document.getElementById('promote-result');
-                result.style.display = 'block';
-                result.className = 'result';
-                result.textContent = 'Pulling latest OpenClaw...';
-                try {{
-                    const resp = await fetch(basePath + '/pull-upstream', {{ method: 'POST' }});
-                    const data = await resp.json();
-                    result.textContent = data.output || data.status || JSON.stringify(data);
-                }} catch(e) {{
-                    result.className = 'result error';
-                    result.textContent = 'Error: ' + e.message;
-                }}
-            }}
-
-            // Load data on page load
-            fetchHealth();
-            checkConfigBackup();
-
-            // Auto-polling intervals (in ms)
-            const POLL_INTERVAL_FAST = 10000;   // 10s for status
-            const POLL_INTERVAL_SLOW = 30000;   // 30s for data
-
-            // Gateway status - poll frequently
-            setInterval(() => {{
-                fetchHealth();
-            }}, POLL_INTERVAL_FAST);
-
-            console.log('ClawFactory UI loaded. Auto-polling enabled.');
-        </script>
-    </body>
-    </html>
-    """
+    gateway_status = await get_gateway_status_async()
+    etag, html = _render_controller(gateway_status)
+
+    # Unchanged page: skip the body (a token login still needs its cookie set)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if auth_result != "set_session" and etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers)
 
-    response = HTMLResponse(html)
+    response = HTMLResponse(html, headers=cache_headers)
 
     # Set session cookie if authenticated via token
     if auth_result == "set_session":
@@ -3386,23 +1050,34 @@ async def root_dashboard(
 # Health & Status
 # ============================================================
 
+def json_etag(payload) -> str:
+    """Weak ETag over a JSON-serializable payload."""
+    body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    return 'W/"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
 @app.get("/health")
 @app.get("/controller/health")
 async def health():
-    """Health check endpoint."""
+    """Liveness probe for container healthchecks; the dashboard polls /status."""
     return {"status": "ok"}
 
 
 @app.get("/status")
 @app.get("/controller/status")
-async def status():
-    """Get current system status."""
-    gateway_status = get_gateway_status()
+async def status(request: Request):
+    """Get current system status (the dashboard polls it with If-None-Match)."""
+    gateway_status = await get_gateway_status_async()
 
-    return {
+    payload = {
         "gateway_status": gateway_status,
         "audit_log": str(AUDIT_LOG),
     }
+    etag = json_etag(payload)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers)
+    return ORJSONResponse(payload, headers=cache_headers)
 
 
 @app.get("/previews")
@@ -3581,23 +1256,6 @@ async def get_inbound_traffic(
     return {"entries": traffic_log.read_nginx_log(limit=limit)}
 
 
-@app.get("/traffic/{request_id}")
-@app.get("/controller/traffic/{request_id}")
-async def get_traffic_detail(
-    request_id: str,
-    token: Optional[str] = Query(None),
-    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
-    authorization: Optional[str] = Header(None),
-):
-    """Single traffic entry detail with full request/response."""
-    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
-        raise HTTPException(status_code=401, detail="Unauthorized")
-    entry = traffic_log.get_llm_session(request_id)
-    if not entry:
-        raise HTTPException(status_code=404, detail="Traffic entry not found")
-    return entry
-
-
 @app.get("/scrub-rules")
 @app.get("/controller/scrub-rules")
 async def get_scrub_rules(
@@ -3780,16 +1438,8 @@ def _install_mitm_ca():
             pass
 
 
-@app.get("/capture")
-@app.get("/controller/capture")
-async def get_capture(
-    token: Optional[str] = Query(None),
-    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
-    authorization: Optional[str] = Header(None),
-):
-    """Get capture enabled state with MITM status."""
-    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
-        raise HTTPException(status_code=401, detail="Unauthorized")
+def capture_status() -> dict:
+    """Capture enabled state, MITM service state and encrypted entry count."""
     enabled = False
     if CAPTURE_STATE_FILE.exists():
         try:
@@ -3819,6 +1469,19 @@ async def get_capture(
     }
 
 
+@app.get("/capture")
+@app.get("/controller/capture")
+async def get_capture(
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """Get capture enabled state with MITM status."""
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return capture_status()
+
+
 @app.post("/capture")
 @app.post("/controller/capture")
 async def set_capture(
@@ -3889,11 +1552,14 @@ async def set_capture(
 @app.get("/traffic/decrypt")
 @app.get("/controller/traffic/decrypt")
 async def decrypt_traffic(
+    request: Request,
     limit: int = 50,
-    offset: int = 0,
+    after: Optional[int] = None,
+    before: Optional[int] = None,
     provider: Optional[str] = None,
     status: Optional[int] = None,
     search: Optional[str] = None,
+    offset: Optional[int] = None,
     token: Optional[str] = Query(None),
     session: Optional[str] = Cookie(None, alias="clawfactory_session"),
     authorization: Optional[str] = Header(None),
@@ -3902,23 +1568,50 @@ async def decrypt_traffic(
     if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
+    if offset is not None:
+        # Offset paging was replaced by cursors; fail loudly rather than
+        # silently serving the newest page to old callers.
+        raise HTTPException(
+            status_code=400,
+            detail="offset is no longer supported; page with after=<older> or before=<newer> from the previous response",
+        )
+    limit = max(1, min(limit, 200))
+    if (after is not None and after < 0) or (before is not None and before < 0):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     fernet_key = _decrypt_fernet_key()
     if not fernet_key:
         raise HTTPException(status_code=404, detail="No encryption key found. Has capture been enabled?")
 
-    limit = max(1, min(limit, 200))
-    offset = max(0, offset)
-
-    entries = traffic_log.read_encrypted_traffic_log(
+    # Cursor paging: only the entries on this page are decrypted
+    page_args = dict(
         fernet_key=fernet_key,
         limit=limit,
-        offset=offset,
+        after=after,
+        before=before,
         provider=provider,
         status=status,
         search=search,
         log_path=ENCRYPTED_TRAFFIC_LOG,
     )
-    return {"entries": entries}
+    if "application/x-ndjson" not in request.headers.get("accept", ""):
+        return traffic_log.read_encrypted_traffic_page(**page_args)
+
+    # NDJSON: one line per entry as soon as it is decrypted, then a final
+    # {"older", "newer"} cursor line. Entries are pulled in a worker thread;
+    # when the client goes away (the dashboard aborts superseded pages) the
+    # stream is cancelled and `cancelled` stops the scan mid-log.
+    cancelled = threading.Event()
+    page = traffic_log.iter_encrypted_traffic_page(**page_args, cancelled=cancelled)
+
+    async def stream():
+        try:
+            while (item := await asyncio.to_thread(next, page, None)) is not None:
+                yield orjson.dumps(item[1]) + b"\n"
+        finally:
+            cancelled.set()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.get("/traffic/decrypt/stats")
@@ -3943,6 +1636,7 @@ async def decrypt_traffic_stats(
 @app.get("/controller/traffic/decrypt/{request_id}")
 async def decrypt_traffic_detail(
     request_id: str,
+    request: Request,
     token: Optional[str] = Query(None),
     session: Optional[str] = Cookie(None, alias="clawfactory_session"),
     authorization: Optional[str] = Header(None),
@@ -3958,7 +1652,44 @@ async def decrypt_traffic_detail(
     entry = traffic_log.get_encrypted_entry(fernet_key, request_id, ENCRYPTED_TRAFFIC_LOG)
     if not entry:
         raise HTTPException(status_code=404, detail="Traffic entry not found")
-    return entry
+    return _traffic_detail_response(request, entry)
+
+
+# Detail bodies can be large; NDJSON clients get the scalar fields on the first
+# line and each body on its own line after it, so they can render the card
+# before the bodies arrive and parse a body only when it is shown.
+_TRAFFIC_BODY_FIELDS = ("request_body", "response_body")
+
+
+def _traffic_detail_response(request: Request, entry: dict) -> Response:
+    """Serialize a traffic entry as JSON, or as NDJSON when the client accepts it."""
+    if "application/x-ndjson" not in request.headers.get("accept", ""):
+        return Response(orjson.dumps(entry), media_type="application/json")
+    head = {k: v for k, v in entry.items() if k not in _TRAFFIC_BODY_FIELDS}
+    lines = [head, *(entry.get(k) for k in _TRAFFIC_BODY_FIELDS)]
+    return StreamingResponse(
+        (orjson.dumps(line) + b"\n" for line in lines),
+        media_type="application/x-ndjson",
+    )
+
+
+# Registered after /traffic/decrypt so the catch-all id route does not shadow it
+@app.get("/traffic/{request_id}")
+@app.get("/controller/traffic/{request_id}")
+async def get_traffic_detail(
+    request_id: str,
+    request: Request,
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """Single traffic entry detail with full request/response."""
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    entry = traffic_log.get_llm_session(request_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Traffic entry not found")
+    return _traffic_detail_response(request, entry)
 
 
 @app.post("/traffic/delete")
@@ -3996,6 +1727,102 @@ async def delete_traffic_logs(
     return {"deleted_log": deleted_log, "deleted_key": deleted_key}
 
 
+# ============================================================
+# Live Events (SSE)
+# ============================================================
+
+EVENTS_POLL_INTERVAL = 2.0  # seconds between checks on each stream
+EVENTS_KEEPALIVE_POLLS = 15  # idle polls before a keep-alive comment
+
+
+def _stat_sig(path: Path) -> tuple | None:
+    """(size, mtime) of a path, or None when it does not exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+# Fields the dashboard's traffic table shows; pushed rows carry only these
+# (bodies are fetched on demand from /traffic/{id})
+TRAFFIC_ROW_FIELDS = (
+    "id", "timestamp", "provider", "method", "path", "url", "streaming", "is_llm",
+    "response_status", "duration_ms", "tokens_in", "tokens_out",
+)
+
+
+def traffic_row(entry: dict) -> dict:
+    """Summary of a traffic entry with just the table columns."""
+    return {k: entry[k] for k in TRAFFIC_ROW_FIELDS if k in entry}
+
+
+def _events_baseline() -> dict:
+    """Current state of the watched files; only later changes are pushed."""
+    return {
+        "traffic": traffic_log.traffic_log_cursor(),
+        "capture": (_stat_sig(CAPTURE_STATE_FILE), _stat_sig(ENCRYPTED_TRAFFIC_LOG)),
+        "snapshots": _stat_sig(SNAPSHOTS_DIR),
+    }
+
+
+def _poll_events(state: dict) -> list[bytes]:
+    """Events for whatever changed since the last poll (updates state in place)."""
+    out = []
+    entries, state["traffic"] = traffic_log.read_traffic_since(state["traffic"])
+    out.extend(_sse("traffic", traffic_row(entry)) for entry in entries)
+
+    capture = (_stat_sig(CAPTURE_STATE_FILE), _stat_sig(ENCRYPTED_TRAFFIC_LOG))
+    if capture != state["capture"]:
+        state["capture"] = capture
+        out.append(_sse("capture", capture_status()))
+
+    snapshots = _stat_sig(SNAPSHOTS_DIR)
+    if snapshots != state["snapshots"]:
+        state["snapshots"] = snapshots
+        out.append(_sse("snapshots", {"snapshots": snapshot_listing()[0]}))
+    return out
+
+
+@app.get("/events")
+@app.get("/controller/events")
+async def events(
+    request: Request,
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """Server-sent events: new traffic rows, capture state and snapshot list changes."""
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    async def stream():
+        state = await asyncio.to_thread(_events_baseline)
+        idle = 0
+        yield b"retry: 5000\n\n"
+        while not await request.is_disconnected():
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+            chunks = await asyncio.to_thread(_poll_events, state)
+            if chunks:
+                idle = 0
+                yield b"".join(chunks)
+            else:
+                idle += 1
+                if idle >= EVENTS_KEEPALIVE_POLLS:
+                    idle = 0
+                    yield b": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ============================================================
 # Encrypted Snapshots
 # ============================================================
@@ -4237,6 +2064,23 @@ def list_snapshots() -> list:
     return snapshots
 
 
+# list_snapshots() result and its ETag, keyed on the snapshot directory's
+# stat: creating, deleting or renaming a snapshot (or moving the latest
+# link) changes the directory mtime.
+_snapshot_list_cache: dict = {"sig": False, "snapshots": [], "etag": ""}
+
+
+def snapshot_listing() -> tuple[list, str]:
+    """(snapshots, etag), rescanning the directory only after it changed."""
+    sig = _stat_sig(SNAPSHOTS_DIR)
+    if sig != _snapshot_list_cache["sig"]:
+        snapshots = list_snapshots()
+        _snapshot_list_cache["sig"] = sig
+        _snapshot_list_cache["snapshots"] = snapshots
+        _snapshot_list_cache["etag"] = hashlib.blake2b(orjson.dumps(snapshots), digest_size=8).hexdigest()
+    return _snapshot_list_cache["snapshots"], _snapshot_list_cache["etag"]
+
+
 # ============================================================
 # Snapshot Workspace Browser
 # ============================================================
@@ -4389,8 +2233,14 @@ def list_workspace_files(workspace_id: str) -> list:
     return files
 
 
-def read_workspace_file(workspace_id: str, file_path: str) -> dict:
-    """Read a file from the workspace."""
+BROWSE_STREAM_CHUNK = 64 * 1024
+
+
+def stat_workspace_file(workspace_id: str, file_path: str) -> tuple[Path, int, bool]:
+    """Resolve a workspace file for reading: (path, size, is_binary).
+
+    Text files over the editor limit are rejected.
+    """
     resolved = _validate_workspace_path(workspace_id, file_path)
 
     if not resolved.exists():
@@ -4405,17 +2255,31 @@ def read_workspace_file(workspace_id: str, file_path: str) -> dict:
         with open(resolved, "rb") as f:
             chunk = f.read(8192)
             if b'\x00' in chunk:
-                return {"binary": True, "size": size}
+                return resolved, size, True
     except (OSError, IOError):
-        return {"binary": True, "size": size}
+        return resolved, size, True
 
     if size > 2 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File too large (>2MB)")
+    return resolved, size, False
 
+
+def read_workspace_file(workspace_id: str, file_path: str) -> dict:
+    """Read a file from the workspace."""
+    resolved, size, binary = stat_workspace_file(workspace_id, file_path)
+    if binary:
+        return {"binary": True, "size": size}
     content = resolved.read_text(errors="replace")
     return {"content": content, "size": size}
 
 
+def iter_workspace_file(path: Path):
+    """Yield a file's bytes in BROWSE_STREAM_CHUNK pieces."""
+    with open(path, "rb") as f:
+        while chunk := f.read(BROWSE_STREAM_CHUNK):
+            yield chunk
+
+
 def write_workspace_file(workspace_id: str, file_path: str, content: str) -> dict:
     """Write text content to a file in the workspace."""
     resolved = _validate_workspace_path(workspace_id, file_path)
@@ -4662,6 +2526,7 @@ async def snapshot_download(
 @app.get("/snapshot")
 @app.get("/controller/snapshot")
 async def snapshot_list(
+    request: Request,
     token: Optional[str] = Query(None),
     session: Optional[str] = Cookie(None, alias="clawfactory_session"),
     authorization: Optional[str] = Header(None),
@@ -4670,10 +2535,16 @@ async def snapshot_list(
     if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    return {
-        "snapshots": list_snapshots(),
-        "encryption_ready": AGE_KEY.exists() or ensure_snapshot_key()
-    }
+    snapshots, list_etag = snapshot_listing()
+    encryption_ready = AGE_KEY.exists() or ensure_snapshot_key()
+    etag = f'W/"{list_etag}-{int(encryption_ready)}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=cache_headers)
+    return ORJSONResponse(
+        {"snapshots": snapshots, "encryption_ready": encryption_ready},
+        headers=cache_headers,
+    )
 
 
 @app.post("/agent/snapshot")
@@ -5117,15 +2988,30 @@ async def snapshot_browse_files(
 @app.get("/snapshot/browse/file")
 @app.get("/controller/snapshot/browse/file")
 async def snapshot_browse_file_read(
+    request: Request,
     workspace_id: str = Query(...),
     path: str = Query(...),
     token: Optional[str] = Query(None),
     session: Optional[str] = Cookie(None, alias="clawfactory_session"),
     authorization: Optional[str] = Header(None),
 ):
+    """Read a workspace file as {"content", "size"} (or {"binary", "size"}).
+
+    With `Accept: text/plain`, text files are streamed raw instead, with the
+    size in X-File-Size; binary files still get the JSON reply.
+    """
     if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
         raise HTTPException(status_code=401, detail="Unauthorized")
-    return read_workspace_file(workspace_id, path)
+    if "text/plain" not in request.headers.get("accept", ""):
+        return read_workspace_file(workspace_id, path)
+    resolved, size, binary = stat_workspace_file(workspace_id, path)
+    if binary:
+        return {"binary": True, "size": size}
+    return StreamingResponse(
+        iter_workspace_file(resolved),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-File-Size": str(size)},
+    )
 
 
 @app.get("/snapshot/browse/file/download")
@@ -5640,11 +3526,11 @@ def run_gateway_command(cmd: list[str], timeout: int = 30) -> tuple[bool, str]:
             else:
                 return False, result.stdout + result.stderr
         else:
-            client = docker.from_env()
-            gateway = client.containers.get(GATEWAY_CONTAINER)
+            gateway = _get_docker().containers.get(GATEWAY_CONTAINER)
             exit_code, output = gateway.exec_run(cmd, demux=False)
             return exit_code == 0, output.decode() if output else ""
     except Exception as e:
+        _reset_docker(e)
         return False, str(e)
 
 
@@ -5808,7 +3694,7 @@ async def gateway_rebuild_endpoint(
 
             gateway_start()
         else:
-            client = docker.from_env()
+            client = _get_docker()
 
             # Stop the gateway container
             try:
@@ -5845,18 +3731,24 @@ async def gateway_rebuild_endpoint(
     except subprocess.TimeoutExpired:
         return {"error": "Operation timed out"}
     except Exception as e:
+        _reset_docker(e)
         return {"error": str(e)}
 
 
 @app.get("/gateway/logs")
 @app.get("/controller/gateway/logs")
 async def gateway_logs_endpoint(
+    request: Request,
     lines: int = Query(100, ge=1, le=2000),
     token: Optional[str] = Query(None),
     session: Optional[str] = Cookie(None, alias="clawfactory_session"),
     authorization: Optional[str] = Header(None),
 ):
-    """Get gateway container logs."""
+    """Get gateway container logs.
+
+    The tail carries a content ETag, so the dashboard's auto-refresh gets a
+    304 while the gateway is quiet.
+    """
     if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
@@ -5868,13 +3760,20 @@ async def gateway_logs_endpoint(
             )
             logs = result.stdout if result.returncode == 0 else f"Error reading logs: {result.stderr}"
         else:
-            client = docker.from_env()
-            container = client.containers.get(GATEWAY_CONTAINER)
+            container = _get_docker().containers.get(GATEWAY_CONTAINER)
             logs = container.logs(tail=lines, timestamps=False).decode("utf-8", errors="replace")
-        return {"logs": logs, "lines": lines, "container": GATEWAY_CONTAINER}
+        etag = 'W/"' + hashlib.blake2b(f"{lines}|{logs}".encode(), digest_size=8).hexdigest() + '"'
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=cache_headers)
+        return ORJSONResponse(
+            {"logs": logs, "lines": lines, "container": GATEWAY_CONTAINER},
+            headers=cache_headers,
+        )
     except docker.errors.NotFound:
         return {"error": f"Container {GATEWAY_CONTAINER} not found"}
     except Exception as e:
+        _reset_docker(e)
         return {"error": str(e)}
 
 
@@ -5951,21 +3850,13 @@ async def gateway_device_reject(
     return {"status": "rejected", "output": output}
 
 
-@app.get("/gateway/pairing/{channel}")
-@app.get("/controller/gateway/pairing/{channel}")
-async def gateway_pairing_list(
-    channel: str,
-    token: Optional[str] = Query(None),
-    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
-    authorization: Optional[str] = Header(None),
-):
-    """List pending DM pairing requests for a channel."""
-    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
-        raise HTTPException(status_code=401, detail="Unauthorized")
+PAIRING_CHANNELS = ["discord", "telegram", "whatsapp", "slack", "signal", "imessage"]
 
-    valid_channels = ["discord", "telegram", "whatsapp", "slack", "signal", "imessage"]
-    if channel not in valid_channels:
-        return {"error": f"Invalid channel. Valid: {', '.join(valid_channels)}"}
+
+def list_pairing_requests(channel: str) -> dict:
+    """Pending DM pairing requests for one channel (runs a gateway command)."""
+    if channel not in PAIRING_CHANNELS:
+        return {"error": f"Invalid channel. Valid: {', '.join(PAIRING_CHANNELS)}"}
 
     success, output = run_gateway_command(["node", "dist/index.js", "pairing", "list", channel, "--json"])
     if not success:
@@ -5979,6 +3870,41 @@ async def gateway_pairing_list(
         return {"pending": [], "raw": output[:500], "channel": channel}
 
 
+@app.get("/gateway/pairing")
+@app.get("/controller/gateway/pairing")
+async def gateway_pairing_list_many(
+    channels: str = Query(...),
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """List pending pairing requests for several channels (comma-separated) at once.
+
+    Returns {channel: <same body as /gateway/pairing/{channel}>}; the gateway
+    commands run concurrently.
+    """
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    names = list(dict.fromkeys(c.strip() for c in channels.split(",") if c.strip()))
+    results = await asyncio.gather(*(asyncio.to_thread(list_pairing_requests, c) for c in names))
+    return dict(zip(names, results))
+
+
+@app.get("/gateway/pairing/{channel}")
+@app.get("/controller/gateway/pairing/{channel}")
+async def gateway_pairing_list(
+    channel: str,
+    token: Optional[str] = Query(None),
+    session: Optional[str] = Cookie(None, alias="clawfactory_session"),
+    authorization: Optional[str] = Header(None),
+):
+    """List pending DM pairing requests for a channel."""
+    if CONTROLLER_API_TOKEN and not check_auth(token, session, authorization):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return list_pairing_requests(channel)
+
+
 @app.post("/gateway/pairing/approve")
 @app.post("/controller/gateway/pairing/approve")
 async def gateway_pairing_approve(
@@ -5998,9 +3924,8 @@ async def gateway_pairing_approve(
     if not code:
         return {"error": "Missing code"}
 
-    valid_channels = ["discord", "telegram", "whatsapp", "slack", "signal", "imessage"]
-    if channel not in valid_channels:
-        return {"error": f"Invalid channel. Valid: {', '.join(valid_channels)}"}
+    if channel not in PAIRING_CHANNELS:
+        return {"error": f"Invalid channel. Valid: {', '.join(PAIRING_CHANNELS)}"}
 
     success, output = run_gateway_command(["node", "dist/index.js", "pairing", "approve", channel, code])
     audit_log("pairing_approve", {"channel": channel, "code": code, "success": success})
@@ -6298,7 +4223,7 @@ async def agent_gateway_status(
     if not check_agent_auth(token, authorization):
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    status = get_gateway_status()
+    status = await get_gateway_status_async()
     return {"gateway": status, "port": GATEWAY_PORT, "instance": INSTANCE_NAME}
 
 
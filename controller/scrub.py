@@ -6,12 +6,13 @@ Rules are stored in /srv/audit/scrub_rules.json.
 Built-in defaults can be disabled but not deleted.
 """
 
+import functools
 import json
 import os
 import re
 import signal
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 SCRUB_RULES_PATH = Path(os.environ.get("SCRUB_RULES_PATH", "/srv/audit/scrub_rules.json"))
 
@@ -106,7 +107,7 @@ def _validate_rule(rule: dict) -> str | None:
     if len(pattern) > MAX_PATTERN_LEN:
         return f"Pattern too long (max {MAX_PATTERN_LEN})"
     try:
-        re.compile(pattern)
+        _compile(pattern)
     except re.error as e:
         return f"Invalid regex pattern: {e}"
     replacement = rule.get("replacement", "")
@@ -151,16 +152,52 @@ def save_rules(rules: list[dict]):
         json.dump({"rules": user_rules, "builtin_overrides": builtin_overrides}, f, indent=2)
 
 
-def _compile_rules() -> list[tuple[re.Pattern, str]]:
-    """Compile enabled rules into regex patterns."""
+@functools.lru_cache(maxsize=256)
+def _compile(pattern: str) -> re.Pattern:
+    """re.compile, memoized so rule reloads and test runs reuse patterns."""
+    return re.compile(pattern)
+
+
+def _make_scrubber(pattern: str, replacement: str) -> Callable[[str], str]:
+    """Return a text -> text function applying one rule.
+
+    Patterns without regex syntax (and replacements without group
+    references) are applied with str.replace, which is much faster than the
+    regex engine for plain secrets.
+    """
+    if re.escape(pattern) == pattern and "\\" not in replacement:
+        return lambda text: text.replace(pattern, replacement)
+    return functools.partial(_compile(pattern).sub, replacement)
+
+
+# Compiled enabled rules, rebuilt when the rules file changes. Keyed on its
+# stat so processes other than the one that saved the rules pick them up too.
+_compiled_rules: tuple[Any, list[Callable[[str], str]]] = (False, [])
+
+
+def _rules_sig():
+    try:
+        st = SCRUB_RULES_PATH.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _compile_rules() -> list[Callable[[str], str]]:
+    """Compile enabled rules into scrubbing functions."""
+    global _compiled_rules
+    sig = _rules_sig()
+    if _compiled_rules[0] == sig:
+        return _compiled_rules[1]
     compiled = []
     for rule in load_rules():
         if not rule.get("enabled", True):
             continue
         try:
-            compiled.append((re.compile(rule["pattern"]), rule.get("replacement", "***REDACTED***")))
+            compiled.append(_make_scrubber(rule["pattern"], rule.get("replacement", "***REDACTED***")))
         except re.error:
             continue
+    _compiled_rules = (sig, compiled)
     return compiled
 
 
@@ -168,8 +205,8 @@ def scrub(text: str) -> str:
     """Apply all enabled scrub rules to a string."""
     if not text:
         return text
-    for pattern, replacement in _compile_rules():
-        text = pattern.sub(replacement, text)
+    for apply in _compile_rules():
+        text = apply(text)
     return text
 
 
@@ -199,7 +236,7 @@ def test_pattern(pattern: str, replacement: str, sample: str) -> dict:
     if len(replacement) > MAX_REPLACEMENT_LEN:
         return {"valid": False, "error": f"Replacement too long (max {MAX_REPLACEMENT_LEN})", "matches": 0, "result": sample}
     try:
-        compiled = re.compile(pattern)
+        compiled = _compile(pattern)
         # Use SIGALRM for timeout protection against ReDoS (Unix only)
         old_handler = None
         try:
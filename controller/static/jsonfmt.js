@@ -0,0 +1,12 @@
+// Parses and pretty-prints large JSON documents off the dashboard's main thread.
+// Request: { id, raw, check } (JSON text); reply: { id, pretty } or { id, error }.
+// With check set the text is only validated and pretty is null.
+self.onmessage = e => {
+    const { id, raw, check } = e.data;
+    try {
+        const value = JSON.parse(raw);
+        self.postMessage({ id, pretty: check ? null : JSON.stringify(value, null, 2) });
+    } catch (err) {
+        self.postMessage({ id, error: err.message });
+    }
+};
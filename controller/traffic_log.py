@@ -7,8 +7,11 @@ Supports both plaintext (LLM proxy) and encrypted (MITM capture) logs.
 
 import json
 import os
+import threading
+from contextlib import closing
 from pathlib import Path
 
+import orjson
 from cryptography.fernet import Fernet, InvalidToken
 
 TRAFFIC_LOG = Path(os.environ.get("TRAFFIC_LOG", "/srv/audit/traffic.jsonl"))
@@ -55,6 +58,63 @@ def read_traffic_log(
     return entries[offset : offset + limit]
 
 
+# Bytes kept before a cursor's offset to recognise a rewritten log
+_CURSOR_TAIL = 64
+EMPTY_CURSOR = (None, 0, b"")
+
+
+def _tail_before(f, offset: int) -> bytes:
+    start = max(0, offset - _CURSOR_TAIL)
+    f.seek(start)
+    return f.read(offset - start)
+
+
+def traffic_log_cursor() -> tuple:
+    """Cursor at the current end of the traffic log, for read_traffic_since."""
+    try:
+        with open(TRAFFIC_LOG, "rb") as f:
+            st = os.fstat(f.fileno())
+            return (st.st_ino, st.st_size, _tail_before(f, st.st_size))
+    except OSError:
+        return EMPTY_CURSOR
+
+
+def read_traffic_since(cursor: tuple) -> tuple[list[dict], tuple]:
+    """Read entries appended after a cursor. Returns (entries oldest first, new cursor).
+
+    The cursor is (inode, byte offset, bytes just before the offset). A log
+    that was replaced, truncated or rewritten since (different inode, shorter
+    than the offset, or different bytes before it) is read from the start,
+    so entries written after a truncation are not skipped. A partially
+    written last line is left for the next call.
+    """
+    ino, offset, tail = cursor
+    try:
+        f = open(TRAFFIC_LOG, "rb")
+    except OSError:
+        return [], EMPTY_CURSOR
+    with f:
+        st = os.fstat(f.fileno())
+        if st.st_ino != ino or st.st_size < offset or _tail_before(f, offset) != tail:
+            offset, tail = 0, b""
+        if st.st_size == offset:
+            return [], (st.st_ino, offset, tail)
+        f.seek(offset)
+        data = f.read(st.st_size - offset)
+    end = data.rfind(b"\n") + 1
+
+    entries = []
+    for line in data[:end].splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entries.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            continue
+    return entries, (st.st_ino, offset + end, (tail + data[:end])[-_CURSOR_TAIL:])
+
+
 def read_nginx_log(limit: int = 50) -> list[dict]:
     """Read nginx JSON access log entries. Returns newest first."""
     if not NGINX_LOG.exists():
@@ -169,32 +229,156 @@ def _decrypt_lines(fernet_key: bytes, log_path: Path | None = None) -> list[dict
     return entries
 
 
-def read_encrypted_traffic_log(
+_REVERSE_READ_BLOCK = 64 * 1024
+
+
+def _lines_reverse(fh, end: int):
+    """Yield (offset, line) for lines starting before byte offset end, last first."""
+    pos = end
+    tail = b""
+    while pos > 0:
+        size = min(_REVERSE_READ_BLOCK, pos)
+        pos -= size
+        fh.seek(pos)
+        chunk = fh.read(size) + tail
+        lines = chunk.split(b"\n")
+        start = pos + len(chunk)
+        for line in reversed(lines[1:]):
+            start -= len(line)
+            yield start, line
+            start -= 1
+        # The first piece may continue in the previous block
+        tail = lines[0]
+    if tail:
+        yield 0, tail
+
+
+def _lines_forward(fh, start: int):
+    """Yield (offset, line) for lines from byte offset start onwards."""
+    fh.seek(start)
+    offset = start
+    for line in fh:
+        yield offset, line
+        offset += len(line)
+
+
+def iter_encrypted_traffic(
     fernet_key: bytes,
-    limit: int = 50,
-    offset: int = 0,
+    after: int | None = None,
+    before: int | None = None,
     provider: str | None = None,
     status: int | None = None,
     search: str | None = None,
     log_path: Path | None = None,
-) -> list[dict]:
-    """Read encrypted traffic log entries with optional filters. Returns newest first."""
-    entries = _decrypt_lines(fernet_key, log_path)
+    cancelled: threading.Event | None = None,
+):
+    """Yield (offset, entry) for matching encrypted entries, decrypting as it goes.
+
+    Entries come newest first from just before byte offset `after` (default:
+    the end of the log). With `before`, they come oldest first from the entry
+    following the one at that offset. Setting `cancelled` stops the scan at
+    the next line.
+    """
+    path = log_path or ENCRYPTED_TRAFFIC_LOG
+    if not path.exists():
+        return
 
-    filtered = []
-    for entry in entries:
-        if provider and entry.get("provider") != provider:
-            continue
-        if status is not None and entry.get("response_status") != status:
-            continue
-        if search:
-            searchable = json.dumps(entry).lower()
-            if search.lower() not in searchable:
+    f = Fernet(fernet_key)
+    with open(path, "rb") as fh:
+        if before is not None:
+            fh.seek(before)
+            fh.readline()  # the entry at the cursor is already shown
+            lines = _lines_forward(fh, fh.tell())
+        else:
+            end = os.fstat(fh.fileno()).st_size
+            lines = _lines_reverse(fh, end if after is None else min(after, end))
+
+        for offset, line in lines:
+            if cancelled is not None and cancelled.is_set():
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(f.decrypt(line))
+            except (InvalidToken, json.JSONDecodeError):
+                continue
+            if provider and entry.get("provider") != provider:
+                continue
+            if status is not None and entry.get("response_status") != status:
+                continue
+            if search and search.lower() not in json.dumps(entry).lower():
                 continue
-        filtered.append(entry)
+            yield offset, entry
 
-    filtered.reverse()
-    return filtered[offset : offset + limit]
+
+def iter_encrypted_traffic_page(
+    fernet_key: bytes,
+    limit: int = 50,
+    after: int | None = None,
+    before: int | None = None,
+    provider: str | None = None,
+    status: int | None = None,
+    search: str | None = None,
+    log_path: Path | None = None,
+    cancelled: threading.Event | None = None,
+):
+    """Yield ("entry", entry) for one page, newest first, then ("cursors", {...}).
+
+    Pass the `older` cursor as `after` for the next page, or `newer` as
+    `before` for the previous one (None when there is no such page). Only
+    entries up to the page boundary, plus one to detect more, are decrypted.
+    Older-ward pages stream each entry as it is decrypted; a `before` page is
+    read oldest first, so it is collected and reversed.
+    """
+    page = []
+    more = False
+    items = iter_encrypted_traffic(fernet_key, after, before, provider, status, search, log_path, cancelled)
+    with closing(items):
+        for item in items:
+            if len(page) == limit:
+                more = True
+                break
+            page.append(item)
+            if before is None:
+                yield "entry", item[1]
+
+    if before is not None:
+        if not more:
+            # Reached the newest entries: serve a full first page instead
+            yield from iter_encrypted_traffic_page(fernet_key, limit, None, None, provider, status, search, log_path, cancelled)
+            return
+        page.reverse()
+        for _, entry in page:
+            yield "entry", entry
+        has_older, has_newer = True, True
+    else:
+        has_older, has_newer = more, after is not None
+
+    yield "cursors", {
+        "older": page[-1][0] if page and has_older else None,
+        "newer": page[0][0] if page and has_newer else None,
+    }
+
+
+def read_encrypted_traffic_page(
+    fernet_key: bytes,
+    limit: int = 50,
+    after: int | None = None,
+    before: int | None = None,
+    provider: str | None = None,
+    status: int | None = None,
+    search: str | None = None,
+    log_path: Path | None = None,
+) -> dict:
+    """One page of encrypted traffic as {"entries", "older", "newer"} (see iter_encrypted_traffic_page)."""
+    entries = []
+    for kind, value in iter_encrypted_traffic_page(fernet_key, limit, after, before, provider, status, search, log_path):
+        if kind == "entry":
+            entries.append(value)
+        else:
+            return {"entries": entries, **value}
+    return {"entries": entries, "older": None, "newer": None}
 
 
 def get_encrypted_traffic_stats(fernet_key: bytes, log_path: Path | None = None) -> dict:
@@ -249,14 +433,38 @@ def get_encrypted_entry(fernet_key: bytes, request_id: str, log_path: Path | Non
     return None
 
 
+# Running line count of the (append-only) encrypted log, so repeated
+# capture status checks only scan what was written since the last one
+_encrypted_count_lock = threading.Lock()
+_encrypted_count_cache: dict = {"key": None, "offset": 0, "count": 0}
+
+
 def count_encrypted_entries(log_path: Path | None = None) -> int:
-    """Count lines in the encrypted traffic log (without decrypting)."""
+    """Count lines in the encrypted traffic log (without decrypting).
+
+    Only bytes appended since the previous call are read; a replaced or
+    truncated log is recounted from the start.
+    """
     path = log_path or ENCRYPTED_TRAFFIC_LOG
-    if not path.exists():
+    try:
+        st = path.stat()
+    except OSError:
         return 0
-    count = 0
-    with open(path, "rb") as f:
-        for line in f:
-            if line.strip():
-                count += 1
-    return count
+
+    with _encrypted_count_lock:
+        cache = _encrypted_count_cache
+        key = (str(path), st.st_ino)
+        if cache["key"] != key or st.st_size < cache["offset"]:
+            cache.update(key=key, offset=0, count=0)
+        partial = 0
+        with open(path, "rb") as f:
+            f.seek(cache["offset"])
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Still being written: count it now, rescan it next time
+                    partial = 1 if line.strip() else 0
+                    break
+                cache["offset"] += len(line)
+                if line.strip():
+                    cache["count"] += 1
+        return cache["count"] + partial
@@ -229,8 +229,8 @@ install_dependencies() {
         export DEBIAN_FRONTEND=noninteractive
         apt-get install -y -qq python3 python3-pip python3-venv >/dev/null 2>&1
         pip3 install --break-system-packages --ignore-installed -q \
-            fastapi uvicorn python-multipart httpx \
-            PyGithub pyyaml docker python-jose \
+            fastapi 'uvicorn[standard]' python-multipart jinja2 'httpx[http2]' orjson \
+            PyGithub pyyaml docker requests python-jose \
             mitmproxy cryptography \
             google-api-python-client google-auth google-auth-httplib2 google-auth-oauthlib 2>/dev/null
     "
@@ -338,7 +338,7 @@ After=network.target
 [Service]
 Type=simple
 WorkingDirectory=/srv/clawfactory/controller
-ExecStart=/usr/bin/python3 -m uvicorn main:app --host 0.0.0.0 --port 8080
+ExecStart=/usr/bin/python3 -m uvicorn main:app --host 0.0.0.0 --port 8080 --loop uvloop --http httptools
 Restart=on-failure
 RestartSec=5
 
@@ -372,7 +372,7 @@ After=network.target
 [Service]
 Type=simple
 WorkingDirectory=/srv/clawfactory/controller
-ExecStart=/usr/bin/python3 -m uvicorn llm_proxy:create_app --factory --host 0.0.0.0 --port 9090
+ExecStart=/usr/bin/python3 -m uvicorn llm_proxy:create_app --factory --host 0.0.0.0 --port 9090 --loop uvloop --http httptools --no-access-log
 Environment=TRAFFIC_LOG=/srv/clawfactory/audit/traffic.jsonl
 Environment=SCRUB_RULES_PATH=/srv/clawfactory/audit/scrub_rules.json
 Environment=CAPTURE_STATE_FILE=/srv/clawfactory/audit/capture_enabled
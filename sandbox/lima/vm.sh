@@ -132,9 +132,11 @@ lima_sync() {
     #   snapshots/ — encrypted snapshots
     #   audit/     — traffic logs
     #   mitm-ca/   — mitmproxy CA certs
+    #   controller/static/codemirror-bundle.* — built by lima_build
     _lima_root "
         rsync -av --delete \
             --exclude 'node_modules' \
+            --exclude 'controller/static/codemirror-bundle.*' \
             --exclude '.pnpm-lock-hash' \
             --exclude 'snapshots' \
             --exclude 'bot_repos/*/state' \
@@ -332,6 +334,9 @@ lima_build() {
             pip3 install -q --break-system-packages -r ${LIMA_SRV}/controller/requirements.txt 2>/dev/null
             echo '[build] Python dependencies installed'
         fi
+        if [ -x ${LIMA_SRV}/controller/build-codemirror-bundle.sh ]; then
+            ${LIMA_SRV}/controller/build-codemirror-bundle.sh || echo '[build] CodeMirror bundle not built, using CDN'
+        fi
     "
 
     # Fix ownership so the gateway user can access built files and state
@@ -498,7 +503,7 @@ Environment=MITM_CA_DIR=${LIMA_SRV}/mitm-ca
 Environment=TEMPORAL_HOST=127.0.0.1:7233
 Environment=WORKFLOWS_DIR=${LIMA_SRV}/workflows
 ExecStart=
-ExecStart=/usr/bin/python3 -m uvicorn main:app --host 0.0.0.0 --port ${CONTROLLER_PORT:-8080}
+ExecStart=/usr/bin/python3 -m uvicorn main:app --host 0.0.0.0 --port ${CONTROLLER_PORT:-8080} --loop uvloop --http httptools
 EOF
 
         # MITM proxy override
@@ -9,6 +9,7 @@ Requires a running testbot instance:
   ./clawfactory.sh -i testbot start
 """
 
+import json
 import os
 import pytest
 import requests
@@ -183,6 +184,167 @@ class TestAuditLog:
         assert isinstance(data["entries"], list)
 
 
+class TestPairingEndpoints:
+    """Test the batched DM pairing endpoint."""
+
+    def test_pairing_many_shape(self):
+        """Test /gateway/pairing returns one body per requested channel."""
+        resp = requests.get(
+            f"{BASE_URL}/gateway/pairing",
+            params={**get_params(), "channels": "discord,telegram,discord"},
+            timeout=30
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        # Duplicates collapse, order is kept
+        assert list(data) == ["discord", "telegram"]
+        for body in data.values():
+            # Pending list or error, same as /gateway/pairing/{channel}
+            assert "pending" in body or "error" in body
+
+    def test_pairing_many_unknown_channel(self):
+        """Test an unknown channel gets an error body without failing the others."""
+        resp = requests.get(
+            f"{BASE_URL}/gateway/pairing",
+            params={**get_params(), "channels": "discord,nosuchchannel"},
+            timeout=30
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert "Invalid channel" in data["nosuchchannel"]["error"]
+        assert "pending" in data["discord"] or "error" in data["discord"]
+
+    def test_pairing_many_empty_channels(self):
+        """Test an empty channel list returns an empty mapping."""
+        resp = requests.get(
+            f"{BASE_URL}/gateway/pairing",
+            params={**get_params(), "channels": " , "},
+            timeout=5
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {}
+
+    def test_pairing_many_requires_channels(self):
+        """Test the channels parameter is required."""
+        resp = requests.get(f"{BASE_URL}/gateway/pairing", params=get_params(), timeout=5)
+        assert resp.status_code == 422
+
+    @pytest.mark.skipif(not TOKEN, reason="controller has no API token")
+    def test_pairing_many_requires_auth(self):
+        """Test /gateway/pairing rejects requests without credentials."""
+        resp = requests.get(f"{BASE_URL}/gateway/pairing", params={"channels": "discord"}, timeout=5)
+        assert resp.status_code == 401
+
+
+class TestEventsEndpoint:
+    """Test the server-sent events stream."""
+
+    def test_events_stream(self):
+        """Test /events opens an uncompressed event stream with a retry hint."""
+        with requests.get(
+            f"{BASE_URL}/events",
+            params=get_params(),
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+            timeout=10
+        ) as resp:
+            assert resp.status_code == 200
+            assert resp.headers.get("content-type", "").startswith("text/event-stream")
+            assert "gzip" not in resp.headers.get("content-encoding", "")
+            assert next(resp.iter_lines()) == b"retry: 5000"
+
+    @pytest.mark.skipif(not TOKEN, reason="controller has no API token")
+    def test_events_requires_auth(self):
+        """Test /events rejects requests without credentials."""
+        resp = requests.get(f"{BASE_URL}/events", timeout=5)
+        assert resp.status_code == 401
+
+
+class TestDecryptedTraffic:
+    """Test cursor-paged decrypted traffic endpoint."""
+
+    def test_decrypt_page_shape(self):
+        """Test /traffic/decrypt returns entries plus older/newer cursors."""
+        resp = requests.get(
+            f"{BASE_URL}/traffic/decrypt",
+            params={**get_params(), "limit": 5},
+            timeout=30
+        )
+        if resp.status_code == 404:
+            # Capture was never enabled on this instance
+            assert "key" in resp.json()["detail"].lower()
+            return
+        assert resp.status_code == 200
+        data = resp.json()
+        assert isinstance(data["entries"], list)
+        assert len(data["entries"]) <= 5
+        assert "older" in data and "newer" in data
+
+        # Passing `older` as `after` gives the next page, with no overlap
+        if data["older"] is not None:
+            resp = requests.get(
+                f"{BASE_URL}/traffic/decrypt",
+                params={**get_params(), "limit": 5, "after": data["older"]},
+                timeout=30
+            )
+            assert resp.status_code == 200
+            older = resp.json()
+            page_ids = {e.get("id") for e in data["entries"]}
+            assert not page_ids & {e.get("id") for e in older["entries"]}
+            # ...which links back to a newer page
+            assert older["newer"] is not None
+
+    def test_decrypt_ndjson(self):
+        """Test the NDJSON variant ends with a cursor line."""
+        resp = requests.get(
+            f"{BASE_URL}/traffic/decrypt",
+            params={**get_params(), "limit": 5},
+            headers={"Accept": "application/x-ndjson"},
+            timeout=30
+        )
+        if resp.status_code == 404:
+            return
+        assert resp.status_code == 200
+        assert resp.headers.get("content-type", "").startswith("application/x-ndjson")
+        lines = resp.text.splitlines()
+        assert set(json.loads(lines[-1])) == {"older", "newer"}
+
+    @pytest.mark.parametrize("cursor", [{"after": -1}, {"before": -5}])
+    def test_decrypt_negative_cursor(self, cursor):
+        """Test negative cursors are rejected."""
+        resp = requests.get(
+            f"{BASE_URL}/traffic/decrypt",
+            params={**get_params(), **cursor},
+            timeout=5
+        )
+        assert resp.status_code == 400
+
+    def test_decrypt_offset_rejected(self):
+        """Test the removed offset parameter is rejected instead of ignored."""
+        resp = requests.get(
+            f"{BASE_URL}/traffic/decrypt",
+            params={**get_params(), "offset": 50},
+            timeout=5
+        )
+        assert resp.status_code == 400
+        assert "after" in resp.json()["detail"]
+
+    def test_decrypt_non_integer_cursor(self):
+        """Test non-integer cursors fail validation."""
+        resp = requests.get(
+            f"{BASE_URL}/traffic/decrypt",
+            params={**get_params(), "after": "abc"},
+            timeout=5
+        )
+        assert resp.status_code == 422
+
+    @pytest.mark.skipif(not TOKEN, reason="controller has no API token")
+    def test_decrypt_requires_auth(self):
+        """Test /traffic/decrypt rejects requests without credentials."""
+        resp = requests.get(f"{BASE_URL}/traffic/decrypt", timeout=5)
+        assert resp.status_code == 401
+
+
 class TestUIEndpoint:
     """Test that the UI loads."""
 